@@ -230,6 +230,9 @@ class Settings(BaseModel):
     navigation_timeout_complex: int = Field(
         default_factory=lambda: int(os.getenv("NAVIGATION_TIMEOUT_COMPLEX", "45000"))  # Reduced from 60000
     )
+    dns_negative_cache_ttl: float = Field(
+        default_factory=lambda: float(os.getenv("DNS_NEGATIVE_CACHE_TTL", "5"))  # Seconds to remember hosts that failed to resolve after a DNS navigation error, 0 disables the check
+    )
     browser_launch_timeout: int = Field(
         default_factory=lambda: int(os.getenv("BROWSER_LAUNCH_TIMEOUT", "30000"))  # Reduced from 60000
     )
@@ -263,6 +266,10 @@ class Settings(BaseModel):
     retry_jitter: float = Field(
         default_factory=lambda: float(os.getenv("RETRY_JITTER", "0.1"))  # Reduced from 0.2
     )
+    # Backoff policy: "decorrelated", "full" or "exponential" (symmetric RETRY_JITTER band)
+    retry_jitter_mode: str = Field(
+        default_factory=lambda: os.getenv("RETRY_JITTER_MODE", "decorrelated")
+    )
 
     # Context Creation Retry Multipliers
     # These multipliers are applied to the base retry settings for context creation operations
@@ -311,6 +318,12 @@ class Settings(BaseModel):
     max_concurrent_screenshots: int = Field(
         default_factory=lambda: int(os.getenv("MAX_CONCURRENT_SCREENSHOTS", "32"))
     )
+    screenshot_queue_depth: int = Field(
+        default_factory=lambda: int(os.getenv("SCREENSHOT_QUEUE_DEPTH", "200"))  # Max captures waiting for a slot
+    )
+    screenshot_queue_timeout: int = Field(
+        default_factory=lambda: int(os.getenv("SCREENSHOT_QUEUE_TIMEOUT", "60"))  # Max seconds waiting for a slot
+    )
     max_concurrent_contexts: int = Field(
         default_factory=lambda: int(os.getenv("MAX_CONCURRENT_CONTEXTS", "64"))
     )
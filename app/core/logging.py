@@ -3,6 +3,9 @@ import sys
 from typing import Any, Dict
 
 from loguru import logger
+
+from app.core.errors import CircuitBreakerOpenError
+
 # In Pydantic v2, BaseSettings has moved to pydantic-settings package
 try:
     from pydantic_settings import BaseSettings
@@ -94,7 +97,7 @@ def format_exception(record: Dict[str, Any]) -> str:
     exc_type, exc_value, _ = exception
     
     # Check for common errors that don't need full traceback
-    if exc_type.__name__ == "CircuitBreakerOpenError":
+    if issubclass(exc_type, CircuitBreakerOpenError):
         return f"\n{exc_type.__name__}: {exc_value}"
     
     # For other exceptions, return a simplified traceback
@@ -20,17 +20,23 @@ class BrowserManager:
         self.logger = get_logger("browser_manager")
         self._playwright = None
         self._browser_types: Dict[str, BrowserType] = {}
+        self._init_lock = asyncio.Lock()
         
     async def initialize(self):
         """Initialize Playwright and browser types."""
-        if self._playwright is None:
-            self._playwright = await async_playwright().start()
-            self._browser_types = {
-                "chromium": self._playwright.chromium,
-                "firefox": self._playwright.firefox,
-                "webkit": self._playwright.webkit
-            }
-            self.logger.info("Browser manager initialized with all engines")
+        if self._playwright is not None:
+            return
+        # Concurrent launches (e.g. parallel pool warm-up) must share a single
+        # Playwright driver instead of each starting their own
+        async with self._init_lock:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+                self._browser_types = {
+                    "chromium": self._playwright.chromium,
+                    "firefox": self._playwright.firefox,
+                    "webkit": self._playwright.webkit
+                }
+                self.logger.info("Browser manager initialized with all engines")
     
     async def shutdown(self):
         """Shutdown the browser manager."""
@@ -97,14 +97,16 @@ class BrowserPool:
             if browsers_to_create > 0:
                 self.logger.info(f"Creating {browsers_to_create} browsers to reach minimum pool size")
                 
+                # Start the Playwright driver once up front so the parallel launches
+                # below only pay for the browser handshakes, not the driver startup
+                await browser_manager.initialize()
+
                 # Create initial browser instances in parallel for faster startup
                 # This helps ensure we're ready for concurrent requests right away
-                tasks = []
-                for _ in range(browsers_to_create):
-                    tasks.append(self._create_browser_instance())
-                
-                # Wait for all browsers to be created
-                results = await asyncio.gather(*tasks, return_exceptions=True)
+                results = await asyncio.gather(
+                    *[self._create_browser_instance() for _ in range(browsers_to_create)],
+                    return_exceptions=True
+                )
                 
                 # Process results
                 for result in results:
@@ -116,10 +118,14 @@ class BrowserPool:
                         failure_count += 1
                         continue
                         
-                    if result:  # result is browser_data
-                        self._browsers.append(result)
-                        self._available_browsers.append(len(self._browsers) - 1)
-                        success_count += 1
+                    if not result:
+                        # _create_browser_instance reports launch failures as None
+                        failure_count += 1
+                        continue
+
+                    self._browsers.append(result)
+                    self._available_browsers.append(len(self._browsers) - 1)
+                    success_count += 1
             else:
                 self.logger.info("Pool already at or above minimum size, skipping browser creation")
             
@@ -0,0 +1,96 @@
+"""
+Bulkhead for bounding in-flight operations.
+
+Caps how many operations run at once and how many may wait for a slot, so a
+burst of requests queues briefly or is rejected instead of exhausting the
+browser pool.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from app.core.errors import SystemOverloadedError
+
+
+class Bulkhead:
+    """Bounded semaphore with a limited waiting queue."""
+
+    def __init__(self, max_concurrent: int, queue_depth: int, name: str = "default"):
+        """Initialize the bulkhead.
+
+        Args:
+            max_concurrent: Maximum number of operations running at once
+            queue_depth: Maximum number of operations waiting for a slot
+            name: Name for this bulkhead (for errors and stats)
+        """
+        self.max_concurrent = max_concurrent
+        self.queue_depth = queue_depth
+        self.name = name
+        self._sem = asyncio.Semaphore(max_concurrent)
+        self._in_flight = 0
+        self._waiting = 0
+        self._stats = {
+            "acquired": 0,
+            "rejected": 0,
+            "timeouts": 0
+        }
+
+    @property
+    def in_flight(self) -> int:
+        """Number of operations currently holding a slot."""
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        """Number of operations currently waiting for a slot."""
+        return self._waiting
+
+    @asynccontextmanager
+    async def acquire(self, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block.
+
+        Args:
+            timeout: Maximum seconds to wait for a slot, or None to wait indefinitely
+
+        Raises:
+            SystemOverloadedError: If the waiting queue is full or no slot frees up in time
+        """
+        if self._sem.locked() and self._waiting >= self.queue_depth:
+            self._stats["rejected"] += 1
+            raise SystemOverloadedError(
+                context={"bulkhead": self.name, "reason": "queue_full", **self.get_stats()}
+            )
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._sem.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            raise SystemOverloadedError(
+                context={"bulkhead": self.name, "reason": "timeout", "timeout": timeout, **self.get_stats()}
+            )
+        finally:
+            self._waiting -= 1
+
+        self._in_flight += 1
+        self._stats["acquired"] += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._sem.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bulkhead statistics.
+
+        Returns:
+            Dictionary with bulkhead statistics
+        """
+        return {
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": self.queue_depth,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            **self._stats
+        }
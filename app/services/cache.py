@@ -63,9 +63,10 @@ class CacheService:
             'format': format
         }
         
-        # Convert to a stable JSON string and hash
+        # Convert to a stable JSON string and hash; a 128-bit BLAKE2b digest is
+        # cheaper than SHA-256 and ample for keying an in-memory cache
         param_str = json.dumps(params, sort_keys=True)
-        return hashlib.sha256(param_str.encode()).hexdigest()
+        return hashlib.blake2b(param_str.encode(), digest_size=16).hexdigest()
     
     async def get(self, url: str, width: int, height: int, format: str) -> Optional[str]:
         """Get a cached screenshot URL if available.
@@ -1,9 +1,13 @@
 import asyncio
 import random
+import re
 import time
 import inspect
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, Optional, Callable, Literal, Tuple, Type
 
+import httpx
+
+from app.core.errors import CircuitBreakerOpenError, MaxRetriesExceededError, ValidationError
 from app.core.logging import get_logger
 
 # Import Playwright errors for proper error handling
@@ -14,6 +18,53 @@ except ImportError:
     TargetClosedError = None
 
 
+JitterMode = Literal["full", "decorrelated", "exponential"]
+
+# Transient failures that are always worth another attempt
+DEFAULT_RETRY_ON: Tuple[Type[BaseException], ...] = (TimeoutError, ConnectionError, httpx.TransportError)
+
+# Permanent failures that fail fast: retrying an invalid request only wastes backoff time
+DEFAULT_ABORT_ON: Tuple[Type[BaseException], ...] = (ValueError, ValidationError, PermissionError)
+
+# HTTP statuses that fail fast when raised as httpx.HTTPStatusError: client errors,
+# except request timeouts and rate limiting, which are worth another attempt
+DEFAULT_ABORT_ON_STATUS = frozenset(range(400, 500)) - {408, 429}
+
+# Lowercased error type names that are never retried (permanent failures)
+PERMANENT_ERROR_NAMES = frozenset({
+    "permissionerror",
+    "filenotfounderror",
+    "valueerror",
+    "typeerror"
+})
+
+# Lowercased error type names that are always retried (transient failures)
+TRANSIENT_ERROR_NAMES = frozenset({
+    "timeouterror",
+    "connectionerror",
+    "browsertimeouterror",
+    "navigationerror",
+    "playwrighttimeouterror",
+    "targetclosederror"
+})
+
+# Error message fragments that mark an otherwise unknown error as transient,
+# compiled into one pattern so a message is scanned once instead of per fragment
+RETRY_MESSAGE_PATTERN = re.compile(
+    "|".join(re.escape(pattern) for pattern in (
+        "timeout",
+        "connection refused",
+        "connection reset",
+        "temporary failure",
+        "resource temporarily unavailable",
+        "browser context",
+        "page closed",
+        "target closed"
+    )),
+    re.IGNORECASE
+)
+
+
 class RetryConfig:
     """Configuration for retry behavior with exponential backoff and jitter."""
 
@@ -22,7 +73,12 @@ class RetryConfig:
         max_retries: int,
         base_delay: float,
         max_delay: float,
-        jitter: float
+        jitter: float,
+        jitter_mode: JitterMode = "decorrelated",
+        rng: Optional[random.Random] = None,
+        retry_on: Tuple[Type[BaseException], ...] = DEFAULT_RETRY_ON,
+        abort_on: Tuple[Type[BaseException], ...] = DEFAULT_ABORT_ON,
+        abort_on_status: frozenset = DEFAULT_ABORT_ON_STATUS
     ):
         """Initialize retry configuration.
 
@@ -30,25 +86,60 @@ class RetryConfig:
             max_retries: Maximum number of retry attempts
             base_delay: Base delay in seconds between retries
             max_delay: Maximum delay in seconds between retries
-            jitter: Jitter factor (0-1) to add randomness to delay
+            jitter: Jitter factor (0-1) to add randomness to delay (exponential mode only)
+            jitter_mode: Backoff policy - "decorrelated" (default), "full" or "exponential"
+            rng: Optional random number generator, e.g. a seeded one for reproducible delays
+            retry_on: Exception types that are always retried
+            abort_on: Exception types that are re-raised immediately, without retrying
+                or counting against the circuit breaker
+            abort_on_status: HTTP status codes whose httpx.HTTPStatusError is treated
+                like an abort_on error
         """
         self.max_retries = max_retries
         self.base_delay = base_delay
         self.max_delay = max_delay
         self.jitter = jitter
+        self.jitter_mode = jitter_mode
+        self._random = rng or random
+        self.retry_on = retry_on
+        self.abort_on = abort_on
+        self.abort_on_status = abort_on_status
+
+    def should_abort(self, error: BaseException) -> bool:
+        """Check whether an error is permanent and must not be retried.
+
+        Args:
+            error: The exception raised by the operation
+
+        Returns:
+            True if the error matches abort_on or abort_on_status
+        """
+        if isinstance(error, self.abort_on):
+            return True
+        return isinstance(error, httpx.HTTPStatusError) and error.response.status_code in self.abort_on_status
 
-    def get_delay(self, retry_count: int, error_type: str = None) -> float:
+    def get_delay(self, retry_count: int, error_type: str = None, prev_delay: Optional[float] = None) -> float:
         """Calculate delay with exponential backoff and jitter.
 
+        With decorrelated jitter each delay is drawn from [base_delay, prev_delay * 3],
+        which spreads concurrent retriers apart better than a symmetric jitter band.
+
         Args:
             retry_count: Current retry attempt (0-based)
             error_type: Type of error that occurred (for adaptive delays)
+            prev_delay: Delay used before the previous attempt (decorrelated mode only)
 
         Returns:
             Delay in seconds before next retry
         """
-        # Calculate exponential backoff
-        delay = min(self.max_delay, self.base_delay * (2 ** retry_count))
+        if self.jitter_mode == "decorrelated":
+            upper = max(self.base_delay, (prev_delay or self.base_delay) * 3)
+            delay = self._random.uniform(self.base_delay, upper)
+        elif self.jitter_mode == "full":
+            delay = self._random.uniform(0, self.base_delay * (2 ** retry_count))
+        else:
+            delay = self.base_delay * (2 ** retry_count)
+        delay = min(self.max_delay, delay)
 
         # Apply adaptive delays based on error type
         if error_type:
@@ -65,9 +156,11 @@ class RetryConfig:
         # Ensure we don't exceed max_delay after multipliers
         delay = min(self.max_delay, delay)
 
-        # Add jitter to prevent thundering herd
-        jitter_amount = delay * self.jitter
-        delay = delay + (random.random() * 2 - 1) * jitter_amount
+        # The randomized modes are already jittered; plain exponential backoff
+        # gets a symmetric band to prevent thundering herd
+        if self.jitter_mode == "exponential":
+            jitter_amount = delay * self.jitter
+            delay = delay + (self._random.random() * 2 - 1) * jitter_amount
 
         return max(0, delay)  # Ensure non-negative delay
 
@@ -77,7 +170,11 @@ class RetryConfig:
             "max_retries": self.max_retries,
             "base_delay": self.base_delay,
             "max_delay": self.max_delay,
-            "jitter": self.jitter
+            "jitter": self.jitter,
+            "jitter_mode": self.jitter_mode,
+            "retry_on": [exc.__name__ for exc in self.retry_on],
+            "abort_on": [exc.__name__ for exc in self.abort_on],
+            "abort_on_status": sorted(self.abort_on_status)
         }
 
 
@@ -98,6 +195,8 @@ class CircuitBreaker:
         self.failure_count = 0
         self.last_failure_time = 0
         self.state = "closed"  # closed, open, half-open
+        # Start time of the single recovery probe in flight, if any
+        self._probe_started: Optional[float] = None
         self._lock = asyncio.Lock()
         self._stats = {
             "trips": 0,
@@ -111,6 +210,7 @@ class CircuitBreaker:
     async def record_success(self):
         """Record a successful operation."""
         async with self._lock:
+            self._probe_started = None
             previous_state = self.state
             if self.state == "half-open":
                 self.state = "closed"
@@ -142,10 +242,41 @@ class CircuitBreaker:
 
     async def record_failure(self):
         """Record a failed operation."""
+        # Once open, a failure inside the reset window only updates counters. That needs
+        # no await, so it is atomic on the event loop and can skip the lock.
+        current_time = time.time()
+        if (
+            self.state == "open"
+            and self._probe_started is None
+            and current_time - self.last_failure_time <= self.reset_time
+        ):
+            self._stats["failures"] += 1
+            self.failure_count += 1
+            self.last_failure_time = current_time
+            return
+
         async with self._lock:
             current_time = time.time()
             previous_state = self.state
             self._stats["failures"] += 1
+            self._probe_started = None
+
+            # A failed recovery probe re-opens the circuit for another reset window
+            if self.state == "half-open":
+                self.state = "open"
+                self.last_failure_time = current_time
+                self._stats["trips"] += 1
+
+                self.logger.warning(
+                    f"Circuit breaker {self.name} recovery probe failed: {previous_state} -> {self.state}",
+                    {
+                        "previous_state": previous_state,
+                        "new_state": self.state,
+                        "reason": "probe_failed",
+                        "trips": self._stats["trips"]
+                    }
+                )
+                return
 
             # Check if circuit breaker should reset due to time
             if self.state == "open" and current_time - self.last_failure_time > self.reset_time:
@@ -201,6 +332,9 @@ class CircuitBreaker:
     async def can_execute(self) -> bool:
         """Check if operation can be executed based on circuit breaker state.
 
+        While the circuit is recovering, a single probe request is let through per
+        reset window; concurrent callers are rejected until that probe reports back.
+
         Returns:
             True if operation can be executed, False otherwise
         """
@@ -215,12 +349,13 @@ class CircuitBreaker:
             if self.state == "open":
                 time_since_failure = current_time - self.last_failure_time
 
-                # Implement progressive recovery - allow some requests through even before full reset
+                # Implement progressive recovery - allow an early probe through before full reset
                 # This helps prevent all-or-nothing behavior during high load
                 if time_since_failure >= self.reset_time:
                     # Transition to half-open state
                     previous_state = self.state
                     self.state = "half-open"
+                    self._probe_started = current_time
 
                     # Log state transition
                     self.logger.info(
@@ -234,13 +369,14 @@ class CircuitBreaker:
                     )
 
                     return True
-                elif time_since_failure >= (self.reset_time * 0.5):
-                    # Progressive recovery: Allow some requests through with probability
+                elif time_since_failure >= (self.reset_time * 0.5) and not self._probe_active(current_time):
+                    # Progressive recovery: Allow a probe through with probability
                     # that increases as we get closer to reset_time
                     recovery_progress = (time_since_failure - (self.reset_time * 0.5)) / (self.reset_time * 0.5)
                     allow_request = random.random() < recovery_progress
 
                     if allow_request:
+                        self._probe_started = current_time
                         self.logger.debug(
                             f"Circuit breaker {self.name} allowing request during progressive recovery",
                             {
@@ -265,14 +401,10 @@ class CircuitBreaker:
 
                 return False
 
-            # If circuit is half-open, allow execution (test if system has recovered)
-            # But limit the rate of requests in half-open state to prevent overwhelming the system
+            # If circuit is half-open, allow one probe at a time (test if system has recovered)
+            # so a recovering system is not overwhelmed by concurrent callers
             if self.state == "half-open":
-                # Allow only a percentage of requests through in half-open state
-                # This prevents overwhelming the system during recovery
-                allow_request = random.random() < 0.3  # 30% of requests allowed through
-
-                if not allow_request:
+                if self._probe_active(current_time):
                     self.logger.debug(
                         f"Circuit breaker {self.name} limiting requests in half-open state",
                         {
@@ -280,13 +412,37 @@ class CircuitBreaker:
                             "time_since_last_failure": current_time - self.last_failure_time
                         }
                     )
+                    return False
 
-                return allow_request
+                self._probe_started = current_time
+                return True
                 
             # Default fallback - should never reach here as all states are covered
             # But adding explicit return to satisfy type checker
             return False
 
+    async def release_probe(self):
+        """Let the next caller probe again without recording an outcome.
+
+        Used when a probe ends with an error that says nothing about the health of
+        the dependency, so recovery is not held up until the probe expires.
+        """
+        async with self._lock:
+            self._probe_started = None
+
+    def _probe_active(self, current_time: float) -> bool:
+        """Check whether a recovery probe is still in flight.
+
+        A probe that never reported back (e.g. it was cancelled) expires after reset_time.
+
+        Args:
+            current_time: Current time in seconds since the epoch
+
+        Returns:
+            True if another probe must not be let through yet
+        """
+        return self._probe_started is not None and current_time - self._probe_started < self.reset_time
+
     def get_state(self) -> Dict[str, Any]:
         """Get current circuit breaker state.
 
@@ -343,53 +499,29 @@ class RetryManager:
             True if the error should be retried, False otherwise
         """
         error_type = type(error).__name__
-        error_message = str(error).lower()
 
         # Check for specific Playwright TargetClosedError
         if TargetClosedError and isinstance(error, TargetClosedError):
             self.logger.debug(f"Retrying TargetClosedError: {error_type}")
             return True
 
+        if isinstance(error, self.retry_config.retry_on):
+            return True
+
+        error_name = error_type.lower()
+
         # Never retry these errors (permanent failures)
-        permanent_errors = [
-            "permissionerror",
-            "filenotfounderror",
-            "valueerror",
-            "typeerror"
-        ]
-
-        if error_type.lower() in permanent_errors:
+        if error_name in PERMANENT_ERROR_NAMES:
             self.logger.debug(f"Not retrying permanent error: {error_type}")
             return False
 
         # Always retry these errors (transient failures)
-        transient_errors = [
-            "timeouterror",
-            "connectionerror",
-            "browsertimeouterror",
-            "navigationerror",
-            "playwrighttimeouterror",
-            "targetclosederror"  # Add TargetClosedError to transient errors
-        ]
-
-        if error_type.lower() in transient_errors:
+        if error_name in TRANSIENT_ERROR_NAMES:
             return True
 
         # Check error message for specific patterns
-        retry_patterns = [
-            "timeout",
-            "connection refused",
-            "connection reset",
-            "temporary failure",
-            "resource temporarily unavailable",
-            "browser context",
-            "page closed",
-            "target closed"  # Add pattern for target closed errors
-        ]
-
-        for pattern in retry_patterns:
-            if pattern in error_message:
-                return True
+        if RETRY_MESSAGE_PATTERN.search(str(error)):
+            return True
 
         # For unknown errors, retry if we haven't exceeded a conservative limit
         if retry_count < 3:
@@ -415,6 +547,7 @@ class RetryManager:
         """
         retry_count = 0
         last_error = None
+        prev_delay = None
         self._stats["attempts"] += 1
 
         # Get operation name for logging
@@ -479,7 +612,6 @@ class RetryManager:
                     )
 
                     # Use our custom error class for better error messages
-                    from app.core.errors import CircuitBreakerOpenError
                     raise CircuitBreakerOpenError(
                         name=self.name,
                         context={**context, "circuit_state": circuit_state}
@@ -541,7 +673,32 @@ class RetryManager:
                 )
 
                 return result
+            except asyncio.CancelledError:
+                # A cancelled attempt has no outcome, so do not leave the half-open probe claimed
+                if self.circuit_breaker:
+                    await self.circuit_breaker.release_probe()
+                if "original_max_retries" in locals():
+                    self.retry_config.max_retries = original_max_retries
+                raise
             except Exception as e:
+                # Permanent errors fail fast and say nothing about the health of the dependency
+                if self.retry_config.should_abort(e):
+                    if self.circuit_breaker:
+                        await self.circuit_breaker.release_probe()
+                    if "original_max_retries" in locals():
+                        self.retry_config.max_retries = original_max_retries
+                    self._stats["failures"] += 1
+                    self.logger.warning(
+                        f"Attempt {attempt_number} failed for {operation_name} with non-retryable error, aborting",
+                        {
+                            **context,
+                            "attempt": attempt_number,
+                            "error_type": type(e).__name__,
+                            "error": str(e)
+                        }
+                    )
+                    raise
+
                 # Record failure
                 if self.circuit_breaker:
                     await self.circuit_breaker.record_failure()
@@ -575,7 +732,8 @@ class RetryManager:
 
                 # Calculate delay before retry with adaptive strategy
                 error_type = type(e).__name__
-                delay = self.retry_config.get_delay(retry_count, error_type)
+                delay = self.retry_config.get_delay(retry_count, error_type, prev_delay)
+                prev_delay = delay
 
                 self.logger.warning(
                     f"Attempt {attempt_number} failed for {operation_name}, retrying in {delay:.2f}s",
@@ -605,8 +763,6 @@ class RetryManager:
         )
 
         # Use our custom error class for better error messages
-        from app.core.errors import MaxRetriesExceededError
-
         # Add more detailed context for debugging
         error_context = {
             **context,
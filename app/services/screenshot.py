@@ -1,26 +1,42 @@
 import asyncio
 import os
+import socket
 import time
 import uuid
+from contextlib import AsyncExitStack
 from typing import Dict, Optional, Tuple, Any
+from urllib.parse import urlsplit
 
 from app.core.logging import get_logger
 
 from playwright.async_api import BrowserContext, Page, TimeoutError as PlaywrightTimeoutError
 
 from app.core.config import settings
-from app.core.errors import WebToImgError
+from app.core.errors import NavigationError, WebToImgError
 from app.services.browser_pool import BrowserPool
+from app.services.bulkhead import Bulkhead
 from app.services.retry import RetryConfig, CircuitBreaker, RetryManager
 from app.services.browser_cache import browser_cache_service
 
 
 # TabContextManager removed - using simplified ContextManager approach for reliability
 
+# Seconds to wait for a page to close when a context is released
+PAGE_CLOSE_TIMEOUT = 3.0
+
+# Seconds to spend checking whether a host exists after a DNS navigation error
+DNS_LOOKUP_TIMEOUT = 1.0
+
+# Chromium's navigation error for hosts that failed to resolve
+DNS_ERROR_MARKER = "ERR_NAME_NOT_RESOLVED"
+
 
 class ContextManager:
     """Async context manager for traditional context operations."""
 
+    # Created once per screenshot request, so avoid a per-instance __dict__
+    __slots__ = ("screenshot_service", "width", "height", "context", "browser_index", "page", "_stack")
+
     def __init__(self, screenshot_service, width: int, height: int):
         self.screenshot_service = screenshot_service
         self.width = width
@@ -28,9 +44,14 @@ class ContextManager:
         self.context = None
         self.browser_index = None
         self.page = None
+        # Cleanups for the resources acquired in __aenter__
+        self._stack = None
 
     async def __aenter__(self):
         """Enter the async context manager."""
+        # Each cleanup is registered as its resource is acquired and runs in reverse
+        # order, here if entering fails part way or otherwise in __aexit__
+        self._stack = AsyncExitStack()
         try:
             # Get a context from the pool
             self.context, self.browser_index = await self.screenshot_service._get_context(
@@ -38,64 +59,62 @@ class ContextManager:
             )
             if self.context is None or self.browser_index is None:
                 raise RuntimeError("Failed to get browser context")
+            self._stack.push_async_exit(self._hand_back_context)
 
             # Create a new page
             try:
-                from app.core.config import settings
                 self.page = await asyncio.wait_for(
                     self.context.new_page(),
                     timeout=settings.page_creation_timeout / 1000.0
                 )
+                self._stack.push_async_callback(self._cleanup_page)
                 # Track the page for automatic cleanup
                 await self.screenshot_service._track_resource("page", self.page)
             except asyncio.TimeoutError:
                 self.screenshot_service.logger.error("Timeout creating new page")
-                await self.screenshot_service._return_context(self.context, self.browser_index, is_healthy=False)
                 raise RuntimeError("Timeout creating new page")
             except Exception as e:
                 self.screenshot_service.logger.error(f"Error creating new page: {str(e)}")
-                await self.screenshot_service._return_context(self.context, self.browser_index, is_healthy=False)
                 raise RuntimeError(f"Error creating new page: {str(e)}")
 
             return self.context, self.browser_index, self.page
-        except Exception as e:
-            # Clean up if needed
-            if self.page is not None and not self.page.is_closed():
-                try:
-                    await asyncio.wait_for(self.page.close(), timeout=3.0)
-                    await self.screenshot_service._untrack_resource("page", self.page)
-                except Exception as cleanup_error:
-                    self.screenshot_service.logger.warning(f"Error closing page during exception handling: {str(cleanup_error)}")
-
-            if self.context is not None and self.browser_index is not None:
-                try:
-                    await self.screenshot_service._return_context(self.context, self.browser_index, is_healthy=False)
-                except Exception as cleanup_error:
-                    self.screenshot_service.logger.error(f"Error returning context during exception handling: {str(cleanup_error)}")
+        except BaseException as e:
+            await self._stack.__aexit__(type(e), e, e.__traceback__)
             raise
 
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Exit the async context manager."""
-        # Clean up page
-        if self.page is not None and not self.page.is_closed():
+    async def _close_page(self):
+        """Close the page within PAGE_CLOSE_TIMEOUT and stop tracking it."""
+        # asyncio.timeout bounds the close in place, without wait_for's extra wrapping
+        async with asyncio.timeout(PAGE_CLOSE_TIMEOUT):
+            await self.page.close()
+        await self.screenshot_service._untrack_resource("page", self.page)
+
+    async def _cleanup_page(self):
+        """Close the page if it is still open, logging rather than raising on failure."""
+        if not self.page.is_closed():
             try:
-                await asyncio.wait_for(self.page.close(), timeout=3.0)
-                await self.screenshot_service._untrack_resource("page", self.page)
+                await self._close_page()
             except Exception as e:
                 self.screenshot_service.logger.warning(f"Error closing page during cleanup: {str(e)}")
 
-        # Return context
-        if self.context is not None and self.browser_index is not None:
-            try:
-                # Determine if the context is healthy based on whether an exception occurred
-                is_healthy = exc_type is None
-                await self.screenshot_service._return_context(self.context, self.browser_index, is_healthy)
-            except Exception as e:
-                self.screenshot_service.logger.error(f"Error returning context during cleanup: {str(e)}", {
-                    "error": str(e),
-                    "error_type": type(e).__name__,
-                    "browser_index": self.browser_index
-                })
+    async def _hand_back_context(self, exc_type, exc_val, exc_tb):
+        """Return the context to the pool, marked unhealthy if the block or setup raised."""
+        try:
+            await self.screenshot_service._return_context(
+                self.context, self.browser_index, is_healthy=exc_type is None
+            )
+        except Exception as e:
+            self.screenshot_service.logger.error(f"Error returning context during cleanup: {str(e)}", {
+                "error": str(e),
+                "error_type": type(e).__name__,
+                "browser_index": self.browser_index
+            })
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Exit the async context manager."""
+        # Close the page, then return the context
+        await self._stack.__aexit__(exc_type, exc_val, exc_tb)
+        return False
 
 
 class ScreenshotService:
@@ -128,9 +147,16 @@ class ScreenshotService:
         self._cleanup_interval = settings.screenshot_cleanup_interval or 300  # 5 minutes default
 
         # Concurrency control semaphores for emergency configuration
-        self._screenshot_semaphore = asyncio.Semaphore(settings.max_concurrent_screenshots)
+        self._screenshot_bulkhead = Bulkhead(
+            max_concurrent=settings.max_concurrent_screenshots,
+            queue_depth=settings.screenshot_queue_depth,
+            name="screenshot"
+        )
         self._context_semaphore = asyncio.Semaphore(settings.max_concurrent_contexts)
 
+        # Hosts that recently failed to resolve: host -> (expires_at, error)
+        self._negative_dns_cache: Dict[str, Tuple[float, socket.gaierror]] = {}
+
         # Emergency context creation tracking
         self._emergency_context_count = 0
         self._last_browser_restart = time.time()
@@ -140,14 +166,16 @@ class ScreenshotService:
             max_retries=settings.max_retries_regular,
             base_delay=settings.retry_base_delay,
             max_delay=settings.retry_max_delay,
-            jitter=settings.retry_jitter
+            jitter=settings.retry_jitter,
+            jitter_mode=settings.retry_jitter_mode
         )
 
         self._retry_config_complex = RetryConfig(
             max_retries=settings.max_retries_complex,
             base_delay=settings.retry_base_delay,
             max_delay=settings.retry_max_delay,
-            jitter=settings.retry_jitter
+            jitter=settings.retry_jitter,
+            jitter_mode=settings.retry_jitter_mode
         )
 
         # Create circuit breakers
@@ -386,6 +414,76 @@ class ScreenshotService:
         """
         return ContextManager(self, width, height)
 
+    def _raise_if_host_unresolvable(self, url: str) -> None:
+        """Fail fast for URLs whose host recently failed to resolve.
+
+        This only consults the negative memo filled by _remember_unresolvable_host,
+        so healthy captures never pay for a DNS lookup.
+
+        Args:
+            url: The URL about to be captured
+
+        Raises:
+            NavigationError: If the host is known not to resolve
+        """
+        if not self._negative_dns_cache:
+            return
+        host = urlsplit(url).hostname
+        cached = self._negative_dns_cache.get(host)
+        if cached and cached[0] > time.monotonic():
+            raise NavigationError(url=url, context={"host": host, "dns_cached": True}, original_exception=cached[1])
+
+    @staticmethod
+    def _is_dns_failure(error: BaseException) -> bool:
+        """Check whether a capture error was caused by the host failing to resolve.
+
+        Args:
+            error: The exception raised by the capture
+
+        Returns:
+            True if the error or one of its causes is a DNS navigation error
+        """
+        seen = set()
+        while error is not None and id(error) not in seen:
+            seen.add(id(error))
+            if DNS_ERROR_MARKER in str(error):
+                return True
+            error = getattr(error, "original_exception", None) or error.__cause__ or error.__context__
+        return False
+
+    async def _remember_unresolvable_host(self, url: str) -> None:
+        """Check a failed URL's host and memoize it if it does not exist.
+
+        Called only after a capture has failed with a DNS navigation error. NXDOMAIN answers are remembered for
+        settings.dns_negative_cache_ttl seconds, so repeated attempts against the same
+        unknown host fail without another DNS round trip or browser launch. Temporary
+        resolver failures and lookups slower than DNS_LOOKUP_TIMEOUT are not cached.
+
+        Args:
+            url: The URL whose capture failed
+        """
+        ttl = settings.dns_negative_cache_ttl
+        host = urlsplit(url).hostname
+        if ttl <= 0 or not host:
+            return
+
+        try:
+            async with asyncio.timeout(DNS_LOOKUP_TIMEOUT):
+                await asyncio.get_running_loop().getaddrinfo(host, None)
+        except socket.gaierror as e:
+            if e.errno != socket.EAI_NONAME:
+                return
+            now = time.monotonic()
+            # Drop expired entries so the memo cannot grow without bound
+            if len(self._negative_dns_cache) >= 1024:
+                self._negative_dns_cache = {
+                    h: entry for h, entry in self._negative_dns_cache.items() if entry[0] > now
+                }
+            self._negative_dns_cache[host] = (now + ttl, e)
+        except Exception:
+            # The lookup is advisory; never mask the original capture error
+            return
+
     async def _get_navigation_strategy(self) -> Tuple[str, int]:
         """Get the navigation strategy for all URLs.
 
@@ -408,8 +506,8 @@ class ScreenshotService:
         Returns:
             Path to the saved screenshot file
         """
-        # Apply concurrency control using semaphore
-        async with self._screenshot_semaphore:
+        # Bound in-flight captures; excess requests wait briefly or are rejected
+        async with self._screenshot_bulkhead.acquire(timeout=settings.screenshot_queue_timeout):
             from app.services.pool_watchdog import pool_watchdog
             if pool_watchdog:
                 pool_watchdog.record_request()
@@ -437,7 +535,7 @@ class ScreenshotService:
 
             # Log browser pool stats before starting
             pool_stats = self._browser_pool.get_stats()
-            concurrent_count = settings.max_concurrent_screenshots - self._screenshot_semaphore._value
+            concurrent_count = self._screenshot_bulkhead.in_flight
 
             # Enhanced logging for emergency configuration monitoring
             log_data = {
@@ -468,6 +566,9 @@ class ScreenshotService:
                 self._last_cleanup = current_time
 
             try:
+                # Skip the browser entirely for hosts that recently failed to resolve
+                self._raise_if_host_unresolvable(url)
+
                 # Execute screenshot capture directly
                 return await self._capture_screenshot_impl(
                     url=url,
@@ -482,6 +583,10 @@ class ScreenshotService:
                 if os.path.exists(filepath):
                     os.unlink(filepath)
 
+                # Remember hosts that do not exist so retries fail fast
+                if self._is_dns_failure(e):
+                    await self._remember_unresolvable_host(url)
+
                 # Log error with structured data
                 duration = time.time() - start_time
                 error_context = {
@@ -527,7 +632,8 @@ class ScreenshotService:
                 max_retries=int(base_max_retries * settings.context_retry_max_retries_multiplier),
                 base_delay=base_config.base_delay * settings.context_retry_base_delay_multiplier,
                 max_delay=base_config.max_delay * settings.context_retry_max_delay_multiplier,
-                jitter=base_config.jitter * settings.context_retry_jitter_multiplier
+                jitter=base_config.jitter * settings.context_retry_jitter_multiplier,
+                jitter_mode=base_config.jitter_mode
             )
 
             # Create a retry manager optimized for high concurrency
@@ -1234,32 +1340,28 @@ class ScreenshotService:
         # Count of removed files
         removed_count = 0
 
-        # Iterate through files in the directory
-        for filename in os.listdir(screenshot_dir):
-            filepath = os.path.join(screenshot_dir, filename)
-
-            # Skip directories
-            if os.path.isdir(filepath):
-                continue
-
-            # Check if file is a temporary screenshot
-            if not filename.startswith('screenshot_'):
-                continue
+        # Iterate through files in the directory; scandir entries carry their type and cache stat results
+        with os.scandir(screenshot_dir) as entries:
+            for entry in entries:
+                # Skip directories
+                if entry.is_dir():
+                    continue
 
-            try:
-                # Get file modification time
-                file_mtime = os.path.getmtime(filepath)
+                # Check if file is a temporary screenshot
+                if not entry.name.startswith('screenshot_'):
+                    continue
 
-                # Remove file if it's older than max_age
-                if now - file_mtime > max_age:
-                    os.unlink(filepath)
-                    removed_count += 1
-            except Exception as e:
-                self.logger.warning(f"Error removing temp file {filepath}: {str(e)}", {
-                    "filepath": filepath,
-                    "error": str(e),
-                    "error_type": type(e).__name__
-                })
+                try:
+                    # Remove file if it's older than max_age
+                    if now - entry.stat().st_mtime > max_age:
+                        os.unlink(entry.path)
+                        removed_count += 1
+                except Exception as e:
+                    self.logger.warning(f"Error removing temp file {entry.path}: {str(e)}", {
+                        "filepath": entry.path,
+                        "error": str(e),
+                        "error_type": type(e).__name__
+                    })
 
         return removed_count
 
@@ -1462,28 +1564,26 @@ class ScreenshotService:
         removed_count = 0
 
         try:
-            # Get all files in the temp directory
-            for filename in os.listdir(temp_dir):
-                filepath = os.path.join(temp_dir, filename)
-
-                # Skip directories
-                if not os.path.isfile(filepath):
-                    continue
+            # Get all files in the temp directory; scandir entries carry their type and cache stat results
+            with os.scandir(temp_dir) as entries:
+                for entry in entries:
+                    # Skip directories
+                    if not entry.is_file():
+                        continue
 
-                # Check if file is older than retention period
-                file_mod_time = os.path.getmtime(filepath)
-                age_seconds = now - file_mod_time
+                    # Check if file is older than retention period
+                    age_seconds = now - entry.stat().st_mtime
 
-                if age_seconds > retention_seconds:
-                    try:
-                        os.remove(filepath)
-                        removed_count += 1
-                    except Exception as e:
-                        self.logger.warning(f"Failed to remove temp file {filepath}: {str(e)}", {
-                            "filepath": filepath,
-                            "error": str(e),
-                            "error_type": type(e).__name__
-                        })
+                    if age_seconds > retention_seconds:
+                        try:
+                            os.remove(entry.path)
+                            removed_count += 1
+                        except Exception as e:
+                            self.logger.warning(f"Failed to remove temp file {entry.path}: {str(e)}", {
+                                "filepath": entry.path,
+                                "error": str(e),
+                                "error_type": type(e).__name__
+                            })
         except Exception as e:
             self.logger.error(f"Error during temp file cleanup: {str(e)}", {
                 "error": str(e),
@@ -4,12 +4,21 @@ Handles URL transformations for specific domains before screenshot capture
 """
 
 import re
-from urllib.parse import urlparse, urlunparse
+from functools import lru_cache
 from typing import Optional
 from app.core.logging import get_logger
 
 logger = get_logger("url_transformer")
 
+# Optional "scheme:" prefix, using the characters urlparse accepts in a scheme
+_SCHEME = r"(?:[a-z][a-z0-9+.-]*:)?"
+_SCHEME_PREFIX = re.compile(_SCHEME, re.IGNORECASE)
+
+# Optional scheme and "//", an optional "www." and then the host alternation, which
+# must end the authority: a port, credentials or longer host do not match.
+# Each host is its own group, so the matched group's index identifies the rule
+_URL_PATTERN_TEMPLATE = "^" + _SCHEME + r"//(?:www\.)?(?:{domains})(?=[/?#]|$)"
+
 
 class URLTransformer:
     """Handles URL transformations for specific domains."""
@@ -25,6 +34,31 @@ class URLTransformer:
                 'protocol': 'http'
             }
         }
+        self._compile_rules()
+    
+    def _compile_rules(self):
+        """Rebuild the host pattern and replacement prefixes from the transformation rules."""
+        # Replacement prefixes in rule order, indexed by host group number - 1
+        self._replacements = [
+            f"{rule['protocol']}://{rule['new_domain']}"
+            for rule in self.transformations.values()
+        ]
+        if self._replacements:
+            domains = "|".join(f"({re.escape(domain)})" for domain in self.transformations)
+            source = _URL_PATTERN_TEMPLATE.format(domains=domains)
+            self._pattern = re.compile(source, re.IGNORECASE)
+        else:
+            self._pattern = None
+    
+    def _replace_host(self, match: re.Match) -> str:
+        """Replacement for a matched scheme and host: the rule's new protocol and domain."""
+        return self._replacements[match.lastindex - 1]
+    
+    def _match(self, url: str) -> Optional[re.Match]:
+        """Match a URL against the transformable hosts, or return None."""
+        if self._pattern is None:
+            return None
+        return self._pattern.match(url)
     
     def transform_url(self, url: str) -> str:
         """
@@ -37,39 +71,17 @@ class URLTransformer:
             Transformed URL or original URL if no transformation needed
         """
         try:
-            parsed = urlparse(url)
-            original_url = url
+            match = self._match(url)
             
-            # Check if domain needs transformation
-            domain = parsed.netloc.lower()
+            # No transformation needed
+            if match is None:
+                return url
             
-            # Handle www. prefix
-            if domain.startswith('www.'):
-                domain = domain[4:]
+            # Swap the scheme and host, keeping the original path, query, and fragment
+            new_url = self._replace_host(match) + url[match.end():]
             
-            # Check if this domain has a transformation rule
-            if domain in self.transformations:
-                transformation = self.transformations[domain]
-                
-                # Create new URL components
-                new_scheme = transformation['protocol']
-                new_netloc = transformation['new_domain']
-                
-                # Keep the original path, query, and fragment
-                new_url = urlunparse((
-                    new_scheme,
-                    new_netloc,
-                    parsed.path,
-                    parsed.params,
-                    parsed.query,
-                    parsed.fragment
-                ))
-                
-                logger.info(f"URL transformed: {original_url} -> {new_url}")
-                return new_url
-            
-            # No transformation needed
-            return url
+            logger.info(f"URL transformed: {url} -> {new_url}")
+            return new_url
             
         except Exception as e:
             logger.warning(f"Failed to transform URL {url}: {str(e)}")
@@ -86,14 +98,7 @@ class URLTransformer:
             True if domain can be transformed, False otherwise
         """
         try:
-            parsed = urlparse(url)
-            domain = parsed.netloc.lower()
-            
-            # Handle www. prefix
-            if domain.startswith('www.'):
-                domain = domain[4:]
-            
-            return domain in self.transformations
+            return self._match(url) is not None
         except:
             return False
     
@@ -108,8 +113,18 @@ class URLTransformer:
             Domain name or None if extraction fails
         """
         try:
-            parsed = urlparse(url)
-            return parsed.netloc.lower()
+            # The authority follows "//" at the start or right after a "scheme:" prefix
+            prefix, sep, rest = url.partition("//")
+            if not sep or not _SCHEME_PREFIX.fullmatch(prefix):
+                return ""
+            
+            # ... and runs up to the path, query, or fragment
+            host = rest.partition("/")[0].partition("?")[0].partition("#")[0]
+            
+            # Same rejection urlparse applies to a half-bracketed IPv6 host
+            if ("[" in host) != ("]" in host):
+                return None
+            return host.lower()
         except:
             return None
     
@@ -126,6 +141,8 @@ class URLTransformer:
             'new_domain': new_domain,
             'protocol': protocol
         }
+        self._compile_rules()
+        _clear_cached_lookups()
         logger.info(f"Added transformation rule: {original_domain} -> {protocol}://{new_domain}")
     
     def remove_transformation_rule(self, domain: str):
@@ -138,6 +155,8 @@ class URLTransformer:
         domain = domain.lower()
         if domain in self.transformations:
             del self.transformations[domain]
+            self._compile_rules()
+            _clear_cached_lookups()
             logger.info(f"Removed transformation rule for: {domain}")
     
     def list_transformation_rules(self) -> dict:
@@ -153,7 +172,11 @@ class URLTransformer:
 # Create a global instance
 url_transformer = URLTransformer()
 
+# Distinct URLs whose convenience lookups are remembered; screenshot targets repeat often
+LOOKUP_CACHE_SIZE = 4096
+
 
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
 def transform_url(url: str) -> str:
     """
     Convenience function to transform a URL.
@@ -167,6 +190,7 @@ def transform_url(url: str) -> str:
     return url_transformer.transform_url(url)
 
 
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
 def is_transformable_domain(url: str) -> bool:
     """
     Convenience function to check if URL domain can be transformed.
@@ -178,3 +202,9 @@ def is_transformable_domain(url: str) -> bool:
         True if domain can be transformed
     """
     return url_transformer.is_transformable_domain(url)
+
+
+def _clear_cached_lookups():
+    """Forget cached convenience lookups after the transformation rules change."""
+    transform_url.cache_clear()
+    is_transformable_domain.cache_clear()
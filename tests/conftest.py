@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Shared pytest fixtures for the web2img test suite.
+"""
+
+import pytest
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional; tests then run on the default asyncio loop
+    uvloop = None
+
+
+if uvloop is not None:
+    def pytest_asyncio_loop_factories(config, item):
+        """Run async tests on uvloop, whose libuv event loop has less overhead per I/O callback."""
+        return {"uvloop": uvloop.new_event_loop}
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    Session-wide TestClient for the FastAPI app.
+
+    The client is created without entering the app lifespan, so the screenshot
+    service and browser pool are never started; tests that only exercise
+    routing, validation and error handling stay fast and browser-free.
+    """
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.fixture(scope="session")
+async def async_client():
+    """
+    Session-wide httpx.AsyncClient talking to the FastAPI app over ASGI.
+
+    Like client, it does not enter the app lifespan. One transport and
+    connection pool are shared by every test instead of built per call;
+    use tests.utils.async_test_utils.get_async_client() for an isolated client.
+    """
+    from tests.utils.async_test_utils import get_async_client
+
+    client = await get_async_client()
+    async with client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+async def started_screenshot_service():
+    """
+    Screenshot service started once for the whole session.
+
+    Launching the browser pool takes seconds, so integration tests share one
+    running service instead of starting it per test. pytest.ini runs every
+    test and fixture on the session event loop, so it stays usable throughout.
+    """
+    from app.services.screenshot import screenshot_service
+
+    await screenshot_service.startup()
+    yield screenshot_service
+    await screenshot_service.cleanup()
+
+
+@pytest.fixture(scope="session", autouse=True)
+async def cleanup_async_resources_at_end():
+    """
+    Cancel tasks left on the session event loop once all tests have run.
+
+    Doing this per test would also cancel the background tasks of the
+    session-wide screenshot service.
+    """
+    from tests.utils.async_test_utils import cleanup_async_resources
+
+    yield
+    await cleanup_async_resources()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrency helpers in tests/utils/async_test_utils.py.
+"""
+
+import asyncio
+
+import pytest
+
+from tests.utils.async_test_utils import run_concurrent_requests, stream_concurrent_requests
+
+
+class WorkerKilled(BaseException):
+    """A BaseException that is not an Exception, so request workers do not catch it."""
+
+
+async def test_failed_requests_are_yielded_in_place():
+    """Test that an ordinary exception is returned as that request's result."""
+    async def request(client, i):
+        if i == 3:
+            raise ValueError("bad request")
+        return i * 2
+
+    results = await run_concurrent_requests(None, request, 6, max_concurrency=2)
+
+    assert results[:3] == [0, 2, 4]
+    assert isinstance(results[3], ValueError)
+    assert results[4:] == [8, 10]
+
+
+@pytest.mark.parametrize("error", [asyncio.CancelledError, WorkerKilled])
+async def test_killed_worker_stops_the_stream(error):
+    """Test that a worker killed by a BaseException ends the stream instead of hanging it."""
+    async def request(client, i):
+        if i == 1:
+            raise error()
+        await asyncio.sleep(0)
+        return i
+
+    with pytest.raises((RuntimeError, WorkerKilled)):
+        async with asyncio.timeout(5):
+            async for _ in stream_concurrent_requests(None, request, 4, max_concurrency=2):
+                pass
@@ -11,11 +11,19 @@ This script will test various scenarios that might trigger the bug:
 
 import asyncio
 import json
+import os
+import sys
 import time
+from itertools import cycle, islice
 from typing import Dict, Any, List
 import httpx
 from datetime import datetime
 
+# Add the project root to the Python path so the script also runs directly
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.utils.speedups import JSON_INDENT
+
 # Configuration
 BASE_URL = "http://localhost:8000"
 TEST_URLS = [
@@ -71,9 +79,9 @@ class BatchURLTester:
     
     async def wait_for_completion(self, job_id: str, timeout: int = 120) -> Dict[str, Any]:
         """Wait for a job to complete and return the results."""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        while time.time() - start_time < timeout:
+        while time.perf_counter() - start_time < timeout:
             try:
                 response = await self.client.get(f"{BASE_URL}/batch/screenshots/{job_id}/results")
                 response.raise_for_status()
@@ -91,16 +99,23 @@ class BatchURLTester:
     
     async def monitor_url_persistence(self, job_id: str, duration_minutes: int = 5, check_interval: int = 10):
         """Monitor URL persistence over a longer period."""
+        stats, checks = await self._collect_url_checks(job_id, duration_minutes, check_interval)
+        self.results.extend(checks)
+        return stats
+    
+    async def _collect_url_checks(self, job_id: str, duration_minutes: int, check_interval: int):
+        """Poll a job's results and return (stats, checks) without touching shared state."""
         print(f"\n🔍 Monitoring job {job_id} for {duration_minutes} minutes...")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         end_time = start_time + (duration_minutes * 60)
         check_count = 0
         null_count = 0
+        checks = []
         
-        while time.time() < end_time:
+        while time.perf_counter() < end_time:
             check_count += 1
-            elapsed = int(time.time() - start_time)
+            elapsed = int(time.perf_counter() - start_time)
             
             try:
                 results = await self.get_job_results(job_id)
@@ -115,7 +130,7 @@ class BatchURLTester:
                         print(f"❌ Check {check_count} ({elapsed}s): Item {item_id} URL is NULL!")
                         
                         # Record the null occurrence
-                        self.results.append({
+                        checks.append({
                             "timestamp": datetime.now().isoformat(),
                             "job_id": job_id,
                             "item_id": item_id,
@@ -129,7 +144,7 @@ class BatchURLTester:
                         print(f"✓ Check {check_count} ({elapsed}s): Item {item_id} URL present")
                         
                         # Record the successful check
-                        self.results.append({
+                        checks.append({
                             "timestamp": datetime.now().isoformat(),
                             "job_id": job_id,
                             "item_id": item_id,
@@ -146,11 +161,12 @@ class BatchURLTester:
                 print(f"❌ Check {check_count} failed: {e}")
                 await asyncio.sleep(check_interval)
         
-        return {
+        stats = {
             "total_checks": check_count,
             "null_occurrences": null_count,
             "monitoring_duration": duration_minutes
         }
+        return stats, checks
     
     async def test_scenario_1_basic_persistence(self):
         """Test 1: Basic URL persistence over 5 minutes."""
@@ -182,9 +198,9 @@ class BatchURLTester:
         
         job_ids = []
         
-        # Submit 3 jobs quickly
-        for i in range(3):
-            job_id = await self.submit_batch_job([TEST_URLS[i % len(TEST_URLS)]], f"multi-job-{i}")
+        # Submit 3 jobs quickly, rotating through the test URLs
+        for i, url in enumerate(islice(cycle(TEST_URLS), 3)):
+            job_id = await self.submit_batch_job([url], f"multi-job-{i}")
             job_ids.append(job_id)
             print(f"✓ Submitted job {i+1}: {job_id}")
             await asyncio.sleep(1)  # Small delay
@@ -196,15 +212,17 @@ class BatchURLTester:
             completed_jobs.append(job_id)
             print(f"✓ Job {job_id} completed")
         
-        # Monitor all jobs for 3 minutes
-        monitoring_tasks = []
-        for job_id in completed_jobs:
-            task = asyncio.create_task(
-                self.monitor_url_persistence(job_id, duration_minutes=3, check_interval=10)
-            )
-            monitoring_tasks.append(task)
+        # Monitor all jobs for 3 minutes; each monitor keeps its own checks and
+        # they are merged in job order once every monitor has finished
+        outcomes = await asyncio.gather(*(
+            self._collect_url_checks(job_id, duration_minutes=3, check_interval=10)
+            for job_id in completed_jobs
+        ))
         
-        stats_list = await asyncio.gather(*monitoring_tasks)
+        stats_list = []
+        for stats, checks in outcomes:
+            stats_list.append(stats)
+            self.results.extend(checks)
         
         return {
             "test": "multiple_jobs",
@@ -291,7 +309,7 @@ async def main():
         }
         
         with open("comprehensive_batch_test_results.json", "w") as f:
-            json.dump(detailed_results, f, indent=2)
+            json.dump(detailed_results, f, indent=JSON_INDENT)
         
         print(f"\n💾 Detailed results saved to: comprehensive_batch_test_results.json")
 
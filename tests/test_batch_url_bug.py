@@ -9,71 +9,77 @@ This script will:
 """
 
 import asyncio
-import json
+import os
+import sys
 import time
 from typing import Dict, Any
 import httpx
 
+# Add the project root to the Python path so the script also runs directly
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.utils.speedups import JSON_INDENT, json_dumps, json_loads
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 # Configuration
 BASE_URL = "http://localhost:8000"
 TEST_URL = "https://example.com"
 
-async def submit_batch_job() -> str:
+async def submit_batch_job(client: httpx.AsyncClient) -> str:
     """Submit a batch screenshot job and return the job ID."""
-    async with httpx.AsyncClient() as client:
-        payload = {
-            "items": [
-                {
-                    "id": "test-item-1",
-                    "url": TEST_URL,
-                    "width": 1280,
-                    "height": 720,
-                    "format": "png"
-                }
-            ],
-            "config": {
-                "parallel": 1,
-                "timeout": 30,
-                "cache": True
+    payload = {
+        "items": [
+            {
+                "id": "test-item-1",
+                "url": TEST_URL,
+                "width": 1280,
+                "height": 720,
+                "format": "png"
             }
+        ],
+        "config": {
+            "parallel": 1,
+            "timeout": 30,
+            "cache": True
         }
-        
-        response = await client.post(f"{BASE_URL}/batch/screenshots", json=payload)
-        response.raise_for_status()
-        
-        result = response.json()
-        job_id = result["job_id"]
-        print(f"✓ Submitted batch job: {job_id}")
-        return job_id
+    }
+    
+    response = await client.post(f"{BASE_URL}/batch/screenshots", content=json_dumps(payload), headers=JSON_HEADERS)
+    response.raise_for_status()
+    
+    result = json_loads(response.content)
+    job_id = result["job_id"]
+    print(f"✓ Submitted batch job: {job_id}")
+    return job_id
 
-async def get_job_results(job_id: str) -> Dict[str, Any]:
+async def get_job_results(client: httpx.AsyncClient, job_id: str) -> Dict[str, Any]:
     """Get the results for a batch job."""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/batch/screenshots/{job_id}/results")
-        
-        if response.status_code == 202:
-            # Still processing
-            return {"status": "processing"}
-        
-        response.raise_for_status()
-        return response.json()
+    response = await client.get(f"{BASE_URL}/batch/screenshots/{job_id}/results")
+    
+    if response.status_code == 202:
+        # Still processing
+        return {"status": "processing"}
+    
+    response.raise_for_status()
+    return json_loads(response.content)
 
-async def wait_for_completion(job_id: str, max_wait: int = 60) -> Dict[str, Any]:
+async def wait_for_completion(client: httpx.AsyncClient, job_id: str, max_wait: int = 60) -> Dict[str, Any]:
     """Wait for job completion and return final results."""
-    start_time = time.time()
+    start_time = time.perf_counter()
     
-    while time.time() - start_time < max_wait:
-        results = await get_job_results(job_id)
+    while time.perf_counter() - start_time < max_wait:
+        results = await get_job_results(client, job_id)
         
         if results.get("status") != "processing":
             return results
         
-        print(f"⏳ Job still processing... (elapsed: {int(time.time() - start_time)}s)")
+        print(f"⏳ Job still processing... (elapsed: {int(time.perf_counter() - start_time)}s)")
         await asyncio.sleep(2)
     
     raise TimeoutError(f"Job did not complete within {max_wait} seconds")
 
-async def test_url_persistence(job_id: str, num_checks: int = 10, interval: int = 3):
+async def test_url_persistence(client: httpx.AsyncClient, job_id: str, num_checks: int = 10, interval: int = 3):
     """Test if URL persists across multiple result requests."""
     print(f"\n🔍 Testing URL persistence with {num_checks} checks every {interval}s...")
     
@@ -81,7 +87,7 @@ async def test_url_persistence(job_id: str, num_checks: int = 10, interval: int
     
     for i in range(num_checks):
         try:
-            results = await get_job_results(job_id)
+            results = await get_job_results(client, job_id)
             
             # Extract URL from first result item
             items = results.get("results", [])
@@ -144,44 +150,46 @@ async def main():
     print("=" * 50)
     
     try:
-        # Step 1: Submit batch job
-        job_id = await submit_batch_job()
+        # One pooled client for the whole run so polls reuse the same connection
+        async with httpx.AsyncClient(timeout=httpx.Timeout(30.0)) as client:
+            # Step 1: Submit batch job
+            job_id = await submit_batch_job(client)
         
-        # Step 2: Wait for completion
-        print(f"\n⏳ Waiting for job completion...")
-        results = await wait_for_completion(job_id)
+            # Step 2: Wait for completion
+            print(f"\n⏳ Waiting for job completion...")
+            results = await wait_for_completion(client, job_id)
         
-        print(f"✓ Job completed with status: {results.get('status')}")
+            print(f"✓ Job completed with status: {results.get('status')}")
         
-        # Check if we have results
-        items = results.get("results", [])
-        if not items:
-            print("❌ No results found in completed job")
-            return
+            # Check if we have results
+            items = results.get("results", [])
+            if not items:
+                print("❌ No results found in completed job")
+                return
             
-        initial_url = items[0].get("url")
-        if initial_url:
-            print(f"✓ Initial URL present: {initial_url[:60]}...")
-        else:
-            print("❌ No URL in initial results")
-            return
+            initial_url = items[0].get("url")
+            if initial_url:
+                print(f"✓ Initial URL present: {initial_url[:60]}...")
+            else:
+                print("❌ No URL in initial results")
+                return
         
-        # Step 3: Test URL persistence
-        url_history = await test_url_persistence(job_id)
+            # Step 3: Test URL persistence
+            url_history = await test_url_persistence(client, job_id)
         
-        # Step 4: Analyze results
-        analyze_url_history(url_history)
+            # Step 4: Analyze results
+            analyze_url_history(url_history)
         
-        # Step 5: Save detailed results
-        with open("batch_url_test_results.json", "w") as f:
-            json.dump({
-                "job_id": job_id,
-                "initial_results": results,
-                "url_history": url_history,
-                "test_timestamp": time.time()
-            }, f, indent=2)
+            # Step 5: Save detailed results
+            with open("batch_url_test_results.json", "wb") as f:
+                f.write(json_dumps({
+                    "job_id": job_id,
+                    "initial_results": results,
+                    "url_history": url_history,
+                    "test_timestamp": time.time()
+                }, indent=JSON_INDENT))
         
-        print(f"\n💾 Detailed results saved to: batch_url_test_results.json")
+            print(f"\n💾 Detailed results saved to: batch_url_test_results.json")
         
     except Exception as e:
         print(f"❌ Test failed: {e}")
@@ -6,110 +6,179 @@ Tests the browser cache feature for CSS, JS, and media files
 
 import asyncio
 import aiohttp
-import time
-import json
-from typing import Dict, Any, List
+import itertools
+import os
+import statistics
+import sys
+from collections import defaultdict
+from typing import Dict, Any, Iterable
+
+# Add the project root to the Python path so the script also runs directly
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.utils.speedups import json_dumps, json_loads
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Error pages can be large HTML documents; only the head is useful for reporting
+MAX_ERROR_BODY_BYTES = 1024
+
 
 class BrowserCacheTester:
-    def __init__(self, base_url: str = "http://localhost:8000"):
+    def __init__(self, base_url: str = "http://localhost:8000", concurrency: int = 20, connections: int = 64):
         self.base_url = base_url
+        self.concurrency = concurrency
+        # Endpoint URLs are built once rather than on every request
+        self.stats_endpoint = f"{base_url}/browser-cache/stats"
+        self.info_endpoint = f"{base_url}/browser-cache/info"
+        self.performance_endpoint = f"{base_url}/browser-cache/performance"
+        self.cleanup_endpoint = f"{base_url}/browser-cache/cleanup"
+        self.screenshot_endpoint = f"{base_url}/screenshot"
+        self.connections = connections
+        self.session = None
+        self._request_counter = itertools.count()
+    
+    async def __aenter__(self):
+        # One keep-alive pool for every request instead of a session per call;
+        # limit=0 lifts aiohttp's default cap of 100 connections
+        connector = aiohttp.TCPConnector(
+            limit=0,
+            limit_per_host=self.connections,
+            keepalive_timeout=75,
+            use_dns_cache=True,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=120)
+        )
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.session:
+            await self.session.close()
     
     async def test_cache_stats(self) -> Dict[str, Any]:
         """Test cache statistics endpoint."""
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(f"{self.base_url}/browser-cache/stats") as response:
-                    return {
-                        "success": response.status == 200,
-                        "status_code": response.status,
-                        "data": await response.json() if response.status == 200 else await response.text()
-                    }
-            except Exception as e:
+        try:
+            async with self.session.get(self.stats_endpoint) as response:
                 return {
-                    "success": False,
-                    "error": str(e)
+                    "success": response.status == 200,
+                    "status_code": response.status,
+                    "data": await response.json() if response.status == 200 else await response.text()
                 }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
     
     async def test_cache_info(self) -> Dict[str, Any]:
         """Test cache information endpoint."""
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(f"{self.base_url}/browser-cache/info") as response:
-                    return {
-                        "success": response.status == 200,
-                        "status_code": response.status,
-                        "data": await response.json() if response.status == 200 else await response.text()
-                    }
-            except Exception as e:
+        try:
+            async with self.session.get(self.info_endpoint) as response:
                 return {
-                    "success": False,
-                    "error": str(e)
+                    "success": response.status == 200,
+                    "status_code": response.status,
+                    "data": await response.json() if response.status == 200 else await response.text()
                 }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
     
     async def test_cache_performance(self) -> Dict[str, Any]:
         """Test cache performance endpoint."""
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(f"{self.base_url}/browser-cache/performance") as response:
-                    return {
-                        "success": response.status == 200,
-                        "status_code": response.status,
-                        "data": await response.json() if response.status == 200 else await response.text()
-                    }
-            except Exception as e:
+        try:
+            async with self.session.get(self.performance_endpoint) as response:
                 return {
-                    "success": False,
-                    "error": str(e)
+                    "success": response.status == 200,
+                    "status_code": response.status,
+                    "data": await response.json() if response.status == 200 else await response.text()
                 }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
     
     async def test_cache_cleanup(self) -> Dict[str, Any]:
         """Test cache cleanup endpoint."""
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(f"{self.base_url}/browser-cache/cleanup") as response:
-                    return {
-                        "success": response.status == 200,
-                        "status_code": response.status,
-                        "data": await response.json() if response.status == 200 else await response.text()
-                    }
-            except Exception as e:
+        try:
+            async with self.session.post(self.cleanup_endpoint) as response:
                 return {
-                    "success": False,
-                    "error": str(e)
+                    "success": response.status == 200,
+                    "status_code": response.status,
+                    "data": await response.json() if response.status == 200 else await response.text()
                 }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
     
-    async def test_screenshot_with_cache(self, url: str) -> Dict[str, Any]:
-        """Test screenshot capture with browser cache enabled."""
-        payload = {
-            "url": url,
-            "width": 1280,
-            "height": 720,
-            "format": "png"
-        }
+    @staticmethod
+    def encode_screenshot_payload(url: str) -> bytes:
+        """Serialize the screenshot request body for a URL."""
+        return json_dumps({"url": url, "width": 1280, "height": 720, "format": "png"})
+    
+    async def test_screenshot_with_cache(self, url: str, body: bytes = None) -> Dict[str, Any]:
+        """Test screenshot capture with browser cache enabled.
+        
+        Callers that request the same URL repeatedly can pass a pre-encoded
+        body from encode_screenshot_payload to skip per-request serialization.
+        """
+        if body is None:
+            body = self.encode_screenshot_payload(url)
+        
+        request_index = next(self._request_counter)
+        # Sample latency from the loop's monotonic clock, the same one the
+        # scheduler uses, rather than reading a separate clock per task
+        loop = asyncio.get_running_loop()
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                start_time = time.time()
-                async with session.post(
-                    f"{self.base_url}/screenshot",
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=60)
-                ) as response:
-                    end_time = time.time()
-                    
+        try:
+            start_time = loop.time()
+            async with self.session.post(
+                self.screenshot_endpoint,
+                data=body,
+                headers=JSON_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=60)
+            ) as response:
+                if response.status != 200:
+                    error_body = await response.content.read(MAX_ERROR_BODY_BYTES)
                     return {
-                        "success": response.status == 200,
+                        "success": False,
                         "status_code": response.status,
-                        "response_time": end_time - start_time,
+                        "response_time": loop.time() - start_time,
                         "url": url,
-                        "data": await response.json() if response.status == 200 else await response.text()
+                        "request_index": request_index,
+                        "data": error_body.decode("utf-8", errors="replace")
                     }
-            except Exception as e:
+                
+                # Stop the clock once the body has arrived so that client-side
+                # JSON decoding is reported separately from the round trip
+                raw = await response.read()
+                end_time = loop.time()
+                data = json_loads(raw)
+                
                 return {
-                    "success": False,
-                    "error": str(e),
-                    "url": url
+                    "success": True,
+                    "status_code": response.status,
+                    "response_time": end_time - start_time,
+                    "parse_time": loop.time() - end_time,
+                    "url": url,
+                    "request_index": request_index,
+                    "data": data
                 }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "url": url,
+                "request_index": request_index
+            }
     
     async def test_cache_effectiveness(self) -> Dict[str, Any]:
         """Test cache effectiveness by taking screenshots of resource-heavy sites."""
@@ -121,22 +190,27 @@ class BrowserCacheTester:
             "https://cdnjs.com",         # CDN resources
         ]
         
-        results = []
+        # Bound in-flight screenshots so the server is not pushed past capacity
+        semaphore = asyncio.Semaphore(self.concurrency)
         
-        # Get initial cache stats
-        initial_stats = await self.test_cache_stats()
+        # Both requests for a site send the same body, so encode it once
+        body_by_site = {site: self.encode_screenshot_payload(site) for site in test_sites}
         
-        for site in test_sites:
+        async def capture(site: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.test_screenshot_with_cache(site, body_by_site[site])
+        
+        async def measure_site(site: str) -> Dict[str, Any]:
             print(f"Testing cache effectiveness with: {site}")
             
             # First request (should populate cache)
-            first_result = await self.test_screenshot_with_cache(site)
+            first_result = await capture(site)
             await asyncio.sleep(2)  # Brief pause
             
             # Second request (should benefit from cache)
-            second_result = await self.test_screenshot_with_cache(site)
+            second_result = await capture(site)
             
-            results.append({
+            return {
                 "site": site,
                 "first_request": first_result,
                 "second_request": second_result,
@@ -144,15 +218,41 @@ class BrowserCacheTester:
                     "time_difference": first_result.get("response_time", 0) - second_result.get("response_time", 0),
                     "both_successful": first_result.get("success", False) and second_result.get("success", False)
                 }
-            })
-            
-            await asyncio.sleep(3)  # Pause between sites
+            }
+        
+        # Get initial cache stats
+        initial_stats = await self.test_cache_stats()
+        
+        # Sites are independent, so measure them concurrently; the warm-up and
+        # cached request for each site still run in order
+        results = await asyncio.gather(*(measure_site(site) for site in body_by_site))
         
         # Get final cache stats
         final_stats = await self.test_cache_stats()
         
+        # Bucket successful response times per URL in issue order so the
+        # first/cached split does not depend on completion order
+        buckets = defaultdict(list)
+        requests = sorted(
+            (r for result in results for r in (result["first_request"], result["second_request"])),
+            key=lambda r: r["request_index"]
+        )
+        for request in requests:
+            if request.get("success"):
+                buckets[request["url"]].append(request["response_time"])
+        
+        first_request_times = [times[0] for times in buckets.values()]
+        cached_request_times = [t for times in buckets.values() for t in times[1:]]
+        
         return {
             "test_results": results,
+            "response_times": {
+                "first_request_avg": statistics.fmean(first_request_times) if first_request_times else None,
+                "cached_request_avg": statistics.fmean(cached_request_times) if cached_request_times else None,
+                **self._latency_percentiles(
+                    itertools.chain.from_iterable(buckets.values())
+                )
+            },
             "initial_cache_stats": initial_stats,
             "final_cache_stats": final_stats,
             "cache_improvement": {
@@ -163,6 +263,15 @@ class BrowserCacheTester:
             }
         }
     
+    @staticmethod
+    def _latency_percentiles(times: Iterable[float]) -> Dict[str, float]:
+        """Return P50/P95/P99 of the given response times (empty if too few samples)."""
+        times = list(times)
+        if len(times) < 2:
+            return {}
+        cut_points = statistics.quantiles(times, n=100, method="inclusive")
+        return {"p50": cut_points[49], "p95": cut_points[94], "p99": cut_points[98]}
+    
     def print_test_results(self, results: Dict[str, Any]):
         """Print formatted test results."""
         print("=" * 80)
@@ -210,6 +319,15 @@ class BrowserCacheTester:
             print(f"   Cache Hits Gained: {improvement.get('hits_gained', 0)}")
             print(f"   Items Cached: {improvement.get('items_cached', 0)}")
             
+            response_times = eff_result.get("response_times", {})
+            if response_times.get("first_request_avg") is not None:
+                print(f"   Avg First Request: {response_times['first_request_avg']:.2f}s")
+            if response_times.get("cached_request_avg") is not None:
+                print(f"   Avg Cached Request: {response_times['cached_request_avg']:.2f}s")
+            if "p50" in response_times:
+                print(f"   Latency P50/P95/P99: {response_times['p50']:.2f}s / "
+                      f"{response_times['p95']:.2f}s / {response_times['p99']:.2f}s")
+            
             test_results = eff_result.get("test_results", [])
             successful_tests = sum(1 for r in test_results if r["cache_benefit"]["both_successful"])
             print(f"   Successful Tests: {successful_tests}/{len(test_results)}")
@@ -223,64 +341,67 @@ class BrowserCacheTester:
         
         print("\n" + "=" * 80)
 
-async def main():
-    tester = BrowserCacheTester()
+async def main(tester: BrowserCacheTester = None):
+    tester = tester or BrowserCacheTester()
     
-    print("🚀 Starting Browser Cache Tests...")
-    print(f"Testing against: {tester.base_url}")
+    async with tester:
+        print("🚀 Starting Browser Cache Tests...")
+        print(f"Testing against: {tester.base_url}")
     
-    results = {}
+        results = {}
     
-    # Test 1: Cache Stats
-    print("\n📊 Testing cache statistics...")
-    results["cache_stats"] = await tester.test_cache_stats()
+        # Test 1: Cache Stats
+        print("\n📊 Testing cache statistics...")
+        results["cache_stats"] = await tester.test_cache_stats()
     
-    # Test 2: Cache Info
-    print("📋 Testing cache information...")
-    results["cache_info"] = await tester.test_cache_info()
+        # Test 2: Cache Info
+        print("📋 Testing cache information...")
+        results["cache_info"] = await tester.test_cache_info()
     
-    # Test 3: Cache Performance
-    print("⚡ Testing cache performance...")
-    results["cache_performance"] = await tester.test_cache_performance()
+        # Test 3: Cache Performance
+        print("⚡ Testing cache performance...")
+        results["cache_performance"] = await tester.test_cache_performance()
     
-    # Test 4: Cache Cleanup
-    print("🧹 Testing cache cleanup...")
-    results["cache_cleanup"] = await tester.test_cache_cleanup()
+        # Test 4: Cache Cleanup
+        print("🧹 Testing cache cleanup...")
+        results["cache_cleanup"] = await tester.test_cache_cleanup()
     
-    # Test 5: Cache Effectiveness (takes longer)
-    print("🎯 Testing cache effectiveness with real websites...")
-    print("   This may take a few minutes...")
-    results["cache_effectiveness"] = await tester.test_cache_effectiveness()
+        # Test 5: Cache Effectiveness (takes longer)
+        print("🎯 Testing cache effectiveness with real websites...")
+        print("   This may take a few minutes...")
+        results["cache_effectiveness"] = await tester.test_cache_effectiveness()
     
-    # Print results
-    tester.print_test_results(results)
+        # Print results
+        tester.print_test_results(results)
     
-    # Summary
-    successful_tests = sum(1 for test_name, result in results.items() 
-                          if test_name != "cache_effectiveness" and result.get("success", False))
-    total_basic_tests = len(results) - 1  # Exclude effectiveness test
+        # Summary
+        successful_tests = sum(1 for test_name, result in results.items() 
+                              if test_name != "cache_effectiveness" and result.get("success", False))
+        total_basic_tests = len(results) - 1  # Exclude effectiveness test
     
-    print(f"\n🎉 Browser Cache Tests Completed!")
-    print(f"Basic Tests: {successful_tests}/{total_basic_tests} passed")
+        print(f"\n🎉 Browser Cache Tests Completed!")
+        print(f"Basic Tests: {successful_tests}/{total_basic_tests} passed")
     
-    if "cache_effectiveness" in results:
-        eff_data = results["cache_effectiveness"]
-        cache_hits_gained = eff_data.get("cache_improvement", {}).get("hits_gained", 0)
-        if cache_hits_gained > 0:
-            print(f"✅ Cache is working! Gained {cache_hits_gained} cache hits during testing")
-        else:
-            print("⚠️ Cache may not be working optimally - no cache hits gained")
+        if "cache_effectiveness" in results:
+            eff_data = results["cache_effectiveness"]
+            cache_hits_gained = eff_data.get("cache_improvement", {}).get("hits_gained", 0)
+            if cache_hits_gained > 0:
+                print(f"✅ Cache is working! Gained {cache_hits_gained} cache hits during testing")
+            else:
+                print("⚠️ Cache may not be working optimally - no cache hits gained")
 
 if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description="Test browser cache functionality")
     parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--concurrency", type=int, default=20, help="Maximum in-flight screenshot requests")
+    parser.add_argument("--connections", type=int, default=64, help="Maximum keep-alive connections to the API host")
     
     args = parser.parse_args()
     
     # Update the tester with the provided URL
-    tester = BrowserCacheTester(args.url)
+    tester = BrowserCacheTester(args.url, concurrency=args.concurrency, connections=args.connections)
     
     # Run the tests
-    asyncio.run(main())
+    asyncio.run(main(tester))
@@ -4,7 +4,6 @@ Unit Tests for Browser Cache Service
 Tests the browser cache functionality without making actual HTTP requests
 """
 
-import pytest
 import asyncio
 import tempfile
 import shutil
@@ -84,7 +83,6 @@ class TestBrowserCacheService:
         assert not self.cache_service._is_cacheable_resource("https://example.com/api/data")
         assert not self.cache_service._is_cacheable_resource("https://example.com/document.pdf")
     
-    @pytest.mark.asyncio
     async def test_cache_store_and_retrieve(self):
         """Test storing and retrieving from cache."""
         url = "https://example.com/test.css"
@@ -109,7 +107,6 @@ class TestBrowserCacheService:
         assert stats["hits"] == 1, "Should have 1 cache hit"
         assert stats["cached_items"] == 1, "Should have 1 cached item"
     
-    @pytest.mark.asyncio
     async def test_cache_miss(self):
         """Test cache miss for non-existent items."""
         url = "https://example.com/nonexistent.css"
@@ -122,7 +119,6 @@ class TestBrowserCacheService:
         stats = self.cache_service.get_cache_stats()
         assert stats["misses"] == 1, "Should have 1 cache miss"
     
-    @pytest.mark.asyncio
     async def test_cache_size_limit(self):
         """Test cache size limits."""
         # Create content larger than max file size
@@ -138,7 +134,6 @@ class TestBrowserCacheService:
         cached_result = await self.cache_service._get_from_cache(url)
         assert cached_result is None, "Large file should not be cached"
     
-    @pytest.mark.asyncio
     async def test_cache_cleanup(self):
         """Test cache cleanup functionality."""
         # Store some items in cache
@@ -164,7 +159,6 @@ class TestBrowserCacheService:
         stats_after = self.cache_service.get_cache_stats()
         assert stats_after["cached_items"] == 0, "Should have 0 cached items after cleanup"
     
-    @pytest.mark.asyncio
     async def test_cache_clear(self):
         """Test clearing all cache."""
         # Store some items in cache
@@ -245,7 +239,6 @@ class TestBrowserCacheService:
         for url in priority_urls:
             assert self.cache_service._is_cacheable_resource(url), f"Priority domain URL should be cacheable: {url}"
     
-    @pytest.mark.asyncio
     async def test_cache_path_generation(self):
         """Test cache file path generation."""
         url = "https://example.com/test.css"
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the Bulkhead that bounds in-flight screenshot captures.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.errors import SystemOverloadedError
+from app.services.bulkhead import Bulkhead
+
+
+async def test_concurrent_screenshots():
+    """Test that requests beyond max_concurrent wait until an earlier one releases."""
+    bulkhead = Bulkhead(max_concurrent=3, queue_depth=10, name="test_concurrent")
+    loop = asyncio.get_running_loop()
+    started, released = {}, {}
+
+    async def capture(index):
+        async with bulkhead.acquire(timeout=5):
+            started[index] = loop.time()
+            assert bulkhead.in_flight <= bulkhead.max_concurrent
+            await asyncio.sleep(0.05)
+            released[index] = loop.time()
+
+    await asyncio.gather(*(capture(index) for index in range(bulkhead.max_concurrent + 2)))
+
+    first_release = min(released[index] for index in range(bulkhead.max_concurrent))
+    for index in range(bulkhead.max_concurrent, bulkhead.max_concurrent + 2):
+        assert started[index] >= first_release
+    assert bulkhead.in_flight == 0
+    assert bulkhead.waiting == 0
+
+
+async def test_full_queue_rejects():
+    """Test that a request is rejected once every slot and queue position is taken."""
+    bulkhead = Bulkhead(max_concurrent=1, queue_depth=1, name="test_queue_full")
+    release = asyncio.Event()
+
+    async def hold():
+        async with bulkhead.acquire():
+            await release.wait()
+
+    holders = [asyncio.create_task(hold()) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert (bulkhead.in_flight, bulkhead.waiting) == (1, 1)
+
+    with pytest.raises(SystemOverloadedError):
+        async with bulkhead.acquire():
+            pass
+
+    release.set()
+    await asyncio.gather(*holders)
+    assert bulkhead.get_stats()["rejected"] == 1
+
+
+async def test_acquire_timeout():
+    """Test that waiting longer than the timeout raises SystemOverloadedError."""
+    bulkhead = Bulkhead(max_concurrent=1, queue_depth=5, name="test_timeout")
+
+    async with bulkhead.acquire():
+        with pytest.raises(SystemOverloadedError):
+            async with bulkhead.acquire(timeout=0.01):
+                pass
+
+    assert bulkhead.waiting == 0
+    assert bulkhead.get_stats()["timeouts"] == 1
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the screenshot result cache.
+"""
+
+from app.services.cache import CacheService
+
+
+class TestCacheService:
+    """Test cases for the in-memory screenshot result cache."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.cache_service = CacheService()
+        self.cache_service._enabled = True
+
+    def test_key_generation(self):
+        """Test that keys are stable and distinguish every capture parameter."""
+        key = self.cache_service._generate_key("https://example.com", 1280, 720, "png")
+
+        assert key == self.cache_service._generate_key("https://example.com", 1280, 720, "png")
+        assert len(key) == 32, "Cache key should be a 128-bit BLAKE2b hex digest"
+        assert key != self.cache_service._generate_key("https://example.com", 1280, 720, "jpeg")
+        assert key != self.cache_service._generate_key("https://example.com", 800, 600, "png")
+
+    async def test_repeat_request_is_served_from_cache(self):
+        """Test that a stored result is returned for identical parameters only."""
+        await self.cache_service.set("https://example.com", 1280, 720, "png", "https://img/1.png")
+
+        assert await self.cache_service.get("https://example.com", 1280, 720, "png") == "https://img/1.png"
+        assert await self.cache_service.get("https://example.com", 1280, 720, "webp") is None
+
+        stats = self.cache_service.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
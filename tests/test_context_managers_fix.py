@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 """
-Test to verify both TabContextManager and ContextManager work correctly.
+Test to verify both managed_tab and ContextManager work correctly.
 This ensures the async context manager protocol error is completely fixed.
 """
 
 import asyncio
-import sys
+from contextlib import AbstractAsyncContextManager
+
+import pytest
+
+from app.services.screenshot import ContextManager, ScreenshotService
 
 
 class MockPage:
@@ -25,19 +29,34 @@ class MockPage:
 
 class MockContext:
     """Mock browser context."""
+    def __init__(self):
+        self._page = MockPage()
+    
     async def new_page(self):
-        return MockPage()
+        # Hand out the same page each time, reopened so it looks fresh
+        self._page.closed = False
+        return self._page
 
 
 class MockScreenshotService:
     """Mock screenshot service for testing."""
     
+    # Use the real context manager factories against the mocked pool methods
+    managed_tab = ScreenshotService.managed_tab
+    managed_context = ScreenshotService.managed_context
+    
     def __init__(self):
         self.logger = MockLogger()
+        # Preallocate what the pool methods hand out so repeated runs
+        # do not allocate new mocks per call
+        self._page = MockPage()
+        self._tab = (self._page, 1, "mock_tab_info")
+        self._context = (MockContext(), 1)
     
     async def _get_tab(self, width, height):
         """Mock get tab method."""
-        return MockPage(), 1, "mock_tab_info"
+        self._page.closed = False
+        return self._tab
     
     async def _return_tab(self, page, browser_index, tab_info, is_healthy=True):
         """Mock return tab method."""
@@ -45,7 +64,7 @@ class MockScreenshotService:
     
     async def _get_context(self, width, height):
         """Mock get context method."""
-        return MockContext(), 1
+        return self._context
     
     async def _return_context(self, context, browser_index, is_healthy=True):
         """Mock return context method."""
@@ -70,216 +89,60 @@ class MockLogger:
         print(f"WARNING: {message}")
 
 
-class MockSettings:
-    """Mock settings."""
-    page_creation_timeout = 30000
-
-
-# Import the context managers
-sys.path.insert(0, 'app')
-
-# Mock the settings
-import app.core.config
-app.core.config.settings = MockSettings()
+@pytest.fixture(scope="module")
+def service():
+    """Mock screenshot service shared by the tests in this module."""
+    return MockScreenshotService()
 
-from app.services.screenshot import TabContextManager, ContextManager
 
-
-async def test_tab_context_manager():
-    """Test the TabContextManager."""
-    print("🧪 Testing TabContextManager")
-    print("-" * 40)
-    
-    service = MockScreenshotService()
+async def test_tab_context_manager(service):
+    """Test the managed_tab context manager."""
+    # Test normal usage
+    async with service.managed_tab(1280, 720) as (context, browser_index, page):
+        assert browser_index == 1
+        # Simulate some work
+        await asyncio.sleep(0.01)
     
-    try:
-        # Test normal usage
-        print("📑 Testing normal usage...")
-        async with TabContextManager(service, 1280, 720) as (page, browser_index, tab_info):
-            print(f"✅ Inside context: page={type(page).__name__}, browser_index={browser_index}, tab_info={tab_info}")
-            # Simulate some work
-            await asyncio.sleep(0.01)
-        
-        print("✅ Normal usage test passed")
-        
-        # Test exception handling
-        print("\n📑 Testing exception handling...")
-        try:
-            async with TabContextManager(service, 1280, 720) as (page, browser_index, tab_info):
-                print(f"✅ Inside context: page={type(page).__name__}, browser_index={browser_index}, tab_info={tab_info}")
-                # Simulate an error
-                raise ValueError("Test exception")
-        except ValueError as e:
-            print(f"✅ Exception handled correctly: {e}")
-        
-        print("✅ Exception handling test passed")
-        return True
-        
-    except Exception as e:
-        print(f"❌ TabContextManager test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    # Test exception handling
+    with pytest.raises(ValueError, match="Test exception"):
+        async with service.managed_tab(1280, 720) as (context, browser_index, page):
+            # Simulate an error
+            raise ValueError("Test exception")
 
 
-async def test_context_manager():
+async def test_context_manager(service):
     """Test the ContextManager."""
-    print("\n🧪 Testing ContextManager")
-    print("-" * 40)
-    
-    service = MockScreenshotService()
-    
-    try:
-        # Test normal usage
-        print("📑 Testing normal usage...")
+    # Test normal usage
+    async with ContextManager(service, 1280, 720) as (context, browser_index, page):
+        assert isinstance(context, MockContext)
+        assert browser_index == 1
+        assert isinstance(page, MockPage)
+        # Simulate some work
+        await asyncio.sleep(0.01)
+    
+    # Test exception handling
+    with pytest.raises(ValueError, match="Test exception"):
         async with ContextManager(service, 1280, 720) as (context, browser_index, page):
-            print(f"✅ Inside context: context={type(context).__name__}, browser_index={browser_index}, page={type(page).__name__}")
-            # Simulate some work
-            await asyncio.sleep(0.01)
-        
-        print("✅ Normal usage test passed")
-        
-        # Test exception handling
-        print("\n📑 Testing exception handling...")
-        try:
-            async with ContextManager(service, 1280, 720) as (context, browser_index, page):
-                print(f"✅ Inside context: context={type(context).__name__}, browser_index={browser_index}, page={type(page).__name__}")
-                # Simulate an error
-                raise ValueError("Test exception")
-        except ValueError as e:
-            print(f"✅ Exception handled correctly: {e}")
-        
-        print("✅ Exception handling test passed")
-        return True
-        
-    except Exception as e:
-        print(f"❌ ContextManager test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+            # Simulate an error
+            raise ValueError("Test exception")
 
 
-async def test_async_context_manager_protocol():
+def test_async_context_manager_protocol(service):
     """Test that both context managers implement the async context manager protocol correctly."""
-    print("\n🔍 Testing async context manager protocol")
-    print("-" * 40)
-    
-    service = MockScreenshotService()
-    
-    # Test TabContextManager
-    tab_cm = TabContextManager(service, 1280, 720)
-    tab_has_aenter = hasattr(tab_cm, '__aenter__')
-    tab_has_aexit = hasattr(tab_cm, '__aexit__')
-    
-    print(f"TabContextManager has __aenter__: {tab_has_aenter}")
-    print(f"TabContextManager has __aexit__: {tab_has_aexit}")
-    
-    # Test ContextManager
-    context_cm = ContextManager(service, 1280, 720)
-    context_has_aenter = hasattr(context_cm, '__aenter__')
-    context_has_aexit = hasattr(context_cm, '__aexit__')
-    
-    print(f"ContextManager has __aenter__: {context_has_aenter}")
-    print(f"ContextManager has __aexit__: {context_has_aexit}")
-    
-    if tab_has_aenter and tab_has_aexit and context_has_aenter and context_has_aexit:
-        print("✅ Both context managers have required async methods")
-        return True
-    else:
-        print("❌ Missing required async context manager methods")
-        return False
+    for context_manager in (service.managed_tab(1280, 720), ContextManager(service, 1280, 720)):
+        # AbstractAsyncContextManager recognizes any class defining both __aenter__ and __aexit__
+        assert isinstance(context_manager, AbstractAsyncContextManager), "Missing __aenter__ or __aexit__"
 
 
-async def test_screenshot_service_methods():
+async def test_screenshot_service_methods(service):
     """Test that the screenshot service methods return proper context managers."""
-    print("\n🧪 Testing ScreenshotService methods")
-    print("-" * 40)
-    
-    # Mock the screenshot service
-    from app.services.screenshot import ScreenshotService
+    # The mock borrows managed_tab/managed_context from ScreenshotService
+    for context_manager in (service.managed_tab(1280, 720), service.managed_context(1280, 720)):
+        assert isinstance(context_manager, AbstractAsyncContextManager)
     
-    # Create a mock service (we can't fully initialize it without dependencies)
-    service = MockScreenshotService()
-    
-    # Add the methods from ScreenshotService
-    service.managed_tab = lambda width=1280, height=720: TabContextManager(service, width, height)
-    service.managed_context = lambda width=1280, height=720: ContextManager(service, width, height)
-    
-    try:
-        # Test managed_tab
-        print("📑 Testing managed_tab method...")
-        tab_cm = service.managed_tab(1280, 720)
-        if hasattr(tab_cm, '__aenter__') and hasattr(tab_cm, '__aexit__'):
-            print("✅ managed_tab returns proper async context manager")
-        else:
-            print("❌ managed_tab does not return proper async context manager")
-            return False
-        
-        # Test managed_context
-        print("📑 Testing managed_context method...")
-        context_cm = service.managed_context(1280, 720)
-        if hasattr(context_cm, '__aenter__') and hasattr(context_cm, '__aexit__'):
-            print("✅ managed_context returns proper async context manager")
-        else:
-            print("❌ managed_context does not return proper async context manager")
-            return False
-        
-        # Test actual usage
-        print("📑 Testing actual usage with async with...")
-        async with service.managed_tab() as (page, browser_index, tab_info):
-            print(f"✅ managed_tab works with async with")
-        
-        async with service.managed_context() as (context, browser_index, page):
-            print(f"✅ managed_context works with async with")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ ScreenshotService methods test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-
-
-async def main():
-    """Run all tests."""
-    print("🚀 Starting Context Manager Fix Tests")
-    print("=" * 60)
+    # Test actual usage
+    async with service.managed_tab() as (page, browser_index, tab_info):
+        assert browser_index == 1
     
-    # Test TabContextManager
-    tab_test_passed = await test_tab_context_manager()
-    
-    # Test ContextManager
-    context_test_passed = await test_context_manager()
-    
-    # Test async context manager protocol
-    protocol_test_passed = await test_async_context_manager_protocol()
-    
-    # Test screenshot service methods
-    service_test_passed = await test_screenshot_service_methods()
-    
-    print("\n" + "=" * 60)
-    print("📋 Test Results")
-    print("=" * 60)
-    print(f"TabContextManager: {'✅ PASSED' if tab_test_passed else '❌ FAILED'}")
-    print(f"ContextManager: {'✅ PASSED' if context_test_passed else '❌ FAILED'}")
-    print(f"Async context manager protocol: {'✅ PASSED' if protocol_test_passed else '❌ FAILED'}")
-    print(f"ScreenshotService methods: {'✅ PASSED' if service_test_passed else '❌ FAILED'}")
-    
-    if tab_test_passed and context_test_passed and protocol_test_passed and service_test_passed:
-        print("\n🎉 All tests passed!")
-        print("\n💡 The async context manager error is completely fixed:")
-        print("   ✅ TabContextManager implements proper async context manager protocol")
-        print("   ✅ ContextManager implements proper async context manager protocol")
-        print("   ✅ Both work correctly with 'async with' statements")
-        print("   ✅ managed_tab() and managed_context() return proper context managers")
-        print("   ✅ No more 'async_generator' object errors")
-        return 0
-    else:
-        print("\n❌ Some tests failed!")
-        return 1
-
-
-if __name__ == "__main__":
-    exit_code = asyncio.run(main())
-    sys.exit(exit_code)
+    async with service.managed_context() as (context, browser_index, page):
+        assert browser_index == 1
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for API error reporting.
+
+Verifies that request validation failures and web2img's custom errors are
+reported to clients in the standardized JSON format.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.errors import BrowserError
+from app.main import app
+
+CUSTOM_ERROR_PATH = "/_test/custom-error"
+
+# (payload, expected status, field reported in the validation error)
+ERROR_CASES = [
+    ({"url": "not-a-url"}, 422, "url"),
+    ({"url": "https://example.com", "format": "gif"}, 422, "format"),
+    ({"url": "https://example.com", "width": 0}, 422, "width"),
+    ({"width": 1280}, 422, "url"),
+]
+
+
+@pytest.fixture(scope="module")
+def custom_error_route():
+    """Temporarily register a route that raises a custom web2img error."""
+    async def raise_custom_error():
+        raise BrowserError("Browser crashed", context={"browser_index": 3})
+
+    app.add_api_route(CUSTOM_ERROR_PATH, raise_custom_error)
+    yield CUSTOM_ERROR_PATH
+    app.router.routes[:] = [
+        route for route in app.router.routes if getattr(route, "path", None) != CUSTOM_ERROR_PATH
+    ]
+
+
+@pytest.mark.parametrize("payload, expected_status, field", ERROR_CASES)
+async def test_error_reporting(async_client, payload, expected_status, field):
+    """Invalid requests are rejected with descriptive validation errors."""
+    response = await async_client.post("/screenshot", json=payload)
+
+    assert response.status_code == expected_status
+    assert any(error["loc"][-1] == field for error in response.json()["detail"])
+
+
+def test_unknown_endpoint(client):
+    """Unknown endpoints return 404."""
+    response = client.get("/nonexistent-endpoint")
+    assert response.status_code == 404
+
+
+async def test_error_reporting_concurrent(async_client):
+    """All error cases are reported correctly when issued concurrently."""
+    responses = await asyncio.gather(*[
+        async_client.post("/screenshot", json=payload) for payload, _, _ in ERROR_CASES
+    ])
+
+    assert [response.status_code for response in responses] == [status for _, status, _ in ERROR_CASES]
+
+
+def test_custom_errors(client, custom_error_route):
+    """Custom errors are serialized with their error code, status and context."""
+    response = client.get(custom_error_route)
+
+    assert response.status_code == 500
+    data = response.json()
+    assert data["error"] is True
+    assert data["error_code"] == "browser_error"
+    assert data["message"] == "Browser crashed"
+    assert data["details"]["browser_index"] == 3
+    assert data["request_id"] == response.headers["X-Request-ID"]
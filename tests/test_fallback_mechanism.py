@@ -1,212 +1,85 @@
 #!/usr/bin/env python3
 """
 Test to verify the fallback mechanism works correctly.
-This tests that the service gracefully falls back to context-based approach when tab pool fails.
+This tests that the service falls back gracefully when getting a browser context or page fails.
 """
 
-import asyncio
-import sys
-import os
-
-# Add the app directory to the Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
-
-
-class MockSettings:
-    """Mock settings for testing."""
-    enable_tab_reuse = True
-    enable_performance_logging = False
-    max_concurrent_contexts = 10
-    max_concurrent_screenshots = 5
-
-
-class MockTabPool:
-    """Mock tab pool that can simulate failures."""
-    
-    def __init__(self, should_fail=False):
-        self.should_fail = should_fail
-    
-    async def initialize(self):
-        if self.should_fail:
-            raise RuntimeError("Mock tab pool initialization failed")
-    
-    async def get_tab(self, browser_index, context, width, height):
-        if self.should_fail:
-            raise RuntimeError("Mock tab pool get_tab failed")
-        return "mock_page", "mock_tab_info"
-    
-    async def release_tab(self, tab_info, is_healthy=True):
-        if self.should_fail:
-            raise RuntimeError("Mock tab pool release_tab failed")
-    
-    async def shutdown(self):
-        if self.should_fail:
-            raise RuntimeError("Mock tab pool shutdown failed")
-
-
-async def test_tab_pool_initialization_failure():
-    """Test that service handles tab pool initialization failure gracefully."""
-    print("🧪 Testing tab pool initialization failure...")
-    
-    # Mock the settings
-    import app.core.config
-    original_settings = app.core.config.settings
-    app.core.config.settings = MockSettings()
-    
-    try:
-        # Mock the tab pool to fail initialization
-        import app.services.tab_pool
-        original_tab_pool = app.services.tab_pool.tab_pool
-        app.services.tab_pool.tab_pool = MockTabPool(should_fail=True)
-        
-        # Import the screenshot service
-        from app.services.screenshot import ScreenshotService
-        
-        # Create a screenshot service instance
-        service = ScreenshotService()
-        
-        # Try to initialize (should handle tab pool failure gracefully)
-        try:
-            # This would normally be called during startup
-            # We'll just test the tab pool initialization part
-            try:
-                await app.services.tab_pool.tab_pool.initialize()
-                print("❌ Tab pool initialization should have failed")
-                return False
-            except Exception as e:
-                print(f"✅ Tab pool initialization failed as expected: {str(e)}")
-                # Simulate the fallback behavior
-                app.core.config.settings.enable_tab_reuse = False
-                print("✅ Tab reuse disabled as fallback")
-                return True
-                
-        except Exception as e:
-            print(f"❌ Unexpected error during service initialization: {str(e)}")
-            return False
-            
-    finally:
-        # Restore original settings and tab pool
-        app.core.config.settings = original_settings
-        if 'original_tab_pool' in locals():
-            app.services.tab_pool.tab_pool = original_tab_pool
-
-
-async def test_tab_reuse_disabled_fallback():
-    """Test that service works when tab reuse is disabled."""
-    print("\n🧪 Testing tab reuse disabled fallback...")
-    
-    # Mock the settings with tab reuse disabled
-    import app.core.config
-    original_settings = app.core.config.settings
-    mock_settings = MockSettings()
-    mock_settings.enable_tab_reuse = False
-    app.core.config.settings = mock_settings
-    
-    try:
-        # Import the screenshot service
-        from app.services.screenshot import ScreenshotService
-        
-        # Create a screenshot service instance
-        service = ScreenshotService()
-        
-        # Test the _get_tab method (should return None when tab reuse is disabled)
-        result = await service._get_tab(1280, 720)
-        
-        if result == (None, None, None):
-            print("✅ _get_tab correctly returned None when tab reuse is disabled")
-            return True
-        else:
-            print(f"❌ _get_tab should return (None, None, None) but returned: {result}")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Error testing tab reuse disabled: {str(e)}")
-        return False
-        
-    finally:
-        # Restore original settings
-        app.core.config.settings = original_settings
-
-
-async def test_import_error_handling():
-    """Test that service handles tab pool import errors gracefully."""
-    print("\n🧪 Testing tab pool import error handling...")
-    
-    # Mock the settings
-    import app.core.config
-    original_settings = app.core.config.settings
-    app.core.config.settings = MockSettings()
-    
-    try:
-        # Temporarily remove the tab_pool module to simulate import error
-        import sys
-        if 'app.services.tab_pool' in sys.modules:
-            original_module = sys.modules['app.services.tab_pool']
-            del sys.modules['app.services.tab_pool']
-        else:
-            original_module = None
-        
-        # Import the screenshot service
-        from app.services.screenshot import ScreenshotService
-        
-        # Create a screenshot service instance
-        service = ScreenshotService()
-        
-        # Test the _get_tab method (should handle import error gracefully)
-        result = await service._get_tab(1280, 720)
-        
-        if result == (None, None, None):
-            print("✅ _get_tab correctly handled import error")
-            return True
-        else:
-            print(f"❌ _get_tab should return (None, None, None) but returned: {result}")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Error testing import error handling: {str(e)}")
-        return False
-        
-    finally:
-        # Restore original settings and module
-        app.core.config.settings = original_settings
-        if original_module is not None:
-            sys.modules['app.services.tab_pool'] = original_module
-
-
-async def main():
-    """Run all tests."""
-    print("🚀 Starting Fallback Mechanism Tests")
-    print("=" * 60)
-    
-    # Test tab pool initialization failure
-    init_test_passed = await test_tab_pool_initialization_failure()
-    
-    # Test tab reuse disabled fallback
-    disabled_test_passed = await test_tab_reuse_disabled_fallback()
-    
-    # Test import error handling
-    import_test_passed = await test_import_error_handling()
-    
-    print("\n" + "=" * 60)
-    print("📋 Test Results")
-    print("=" * 60)
-    print(f"Tab pool initialization failure: {'✅ PASSED' if init_test_passed else '❌ FAILED'}")
-    print(f"Tab reuse disabled fallback: {'✅ PASSED' if disabled_test_passed else '❌ FAILED'}")
-    print(f"Import error handling: {'✅ PASSED' if import_test_passed else '❌ FAILED'}")
-    
-    if init_test_passed and disabled_test_passed and import_test_passed:
-        print("\n🎉 All fallback tests passed!")
-        print("\n💡 The service correctly handles:")
-        print("   - Tab pool initialization failures")
-        print("   - Tab reuse being disabled")
-        print("   - Import errors for tab pool module")
-        print("   - Graceful fallback to context-based approach")
-        return 0
-    else:
-        print("\n❌ Some fallback tests failed!")
-        return 1
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.config import settings
+from app.core.errors import BrowserTimeoutError
+from app.services.screenshot import ContextManager, ScreenshotService
+
+URL = "https://example.com"
+
+
+@pytest.fixture
+def service():
+    """A ScreenshotService whose browser pool is a mock that hands out browser 0."""
+    service = ScreenshotService()
+    service._browser_pool = MagicMock()
+    service._browser_pool.get_browser = AsyncMock(return_value=(MagicMock(), 0))
+    service._browser_pool.release_browser = AsyncMock()
+    service._browser_pool.release_context = AsyncMock()
+    return service
+
+
+def mock_context():
+    """Return a browser context mock whose new_page() succeeds, and that page."""
+    page = MagicMock()
+    context = MagicMock()
+    context.new_page = AsyncMock(return_value=page)
+    return context, page
+
+
+async def test_tab_reuse_disabled_fallback(service):
+    """Test that tabs are served by the context-based approach."""
+    assert isinstance(service.managed_tab(1280, 720), ContextManager)
+
 
+async def test_context_creation_failure_releases_browser(service):
+    """Test that a failed context creation returns no context and releases the browser as unhealthy."""
+    service._browser_pool.create_context = AsyncMock(side_effect=RuntimeError("context crashed"))
 
-if __name__ == "__main__":
-    exit_code = asyncio.run(main())
-    sys.exit(exit_code)
+    assert await service._get_context(1280, 720) == (None, None)
+    service._browser_pool.release_browser.assert_awaited_once_with(0, is_healthy=False)
+
+
+async def test_managed_tab_without_context(service):
+    """Test that managed_tab raises instead of yielding when no context is available."""
+    service._browser_pool.create_context = AsyncMock(return_value=None)
+
+    with pytest.raises(RuntimeError, match="Failed to get browser context"):
+        async with service.managed_tab(1280, 720):
+            pass
+
+
+async def test_next_timeout_strategy_after_failure(service):
+    """Test that context creation falls back to the next timeout strategy."""
+    context, page = mock_context()
+    service._get_context = AsyncMock(side_effect=[(None, None), (context, 2)])
+
+    assert await service._create_context_and_page(URL, 1280, 720) == (context, 2, page)
+    assert service._get_context.await_count == 2
+
+
+@pytest.mark.parametrize("emergency_enabled", [True, False])
+async def test_emergency_context_after_all_strategies_fail(service, monkeypatch, emergency_enabled):
+    """Test that an emergency context is created only when enabled, once every strategy has failed."""
+    monkeypatch.setattr(settings, "enable_emergency_context", emergency_enabled)
+    service._get_context = AsyncMock(return_value=(None, None))
+    context, page = mock_context()
+    browser = MagicMock()
+    browser.new_context = AsyncMock(return_value=context)
+    service._browser_pool.get_browser = AsyncMock(return_value=(browser, 1))
+    service._browser_pool.get_stats.return_value = {}
+
+    if emergency_enabled:
+        assert await service._create_context_and_page(URL, 1280, 720) == (context, 1, page)
+        assert service._emergency_context_count == 1
+    else:
+        with pytest.raises(BrowserTimeoutError):
+            await service._create_context_and_page(URL, 1280, 720)
+        browser.new_context.assert_not_awaited()
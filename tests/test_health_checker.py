@@ -6,6 +6,20 @@ import httpx
 from app.services.health_checker import HealthCheckService
 from app.core.config import settings
 
+# Canned responses and errors shared by the HTTP tests; building MagicMocks is not cheap
+_RESP_200 = MagicMock(status_code=200, text="OK")
+_RESP_500 = MagicMock(status_code=500, text="Internal Server Error")
+_TIMEOUT = asyncio.TimeoutError()
+_CONNECT_ERROR = httpx.ConnectError("Connection failed")
+
+
+def make_mock_client(response=None, exc=None):
+    """Build a flat httpx.AsyncClient stand-in whose post returns response or raises exc."""
+    client = AsyncMock()
+    client.__aenter__.return_value = client
+    client.post = AsyncMock(return_value=response, side_effect=exc)
+    return client
+
 
 class TestHealthCheckService:
     """Test cases for the HealthCheckService."""
@@ -15,7 +29,6 @@ class TestHealthCheckService:
         """Create a health check service instance for testing."""
         return HealthCheckService()
 
-    @pytest.mark.asyncio
     async def test_service_initialization(self, health_service):
         """Test that the service initializes correctly."""
         assert not health_service._is_running
@@ -24,7 +37,6 @@ class TestHealthCheckService:
         assert health_service._success_count == 0
         assert health_service._failure_count == 0
 
-    @pytest.mark.asyncio
     async def test_get_stats_initial(self, health_service):
         """Test getting stats from a newly initialized service."""
         stats = health_service.get_stats()
@@ -38,7 +50,6 @@ class TestHealthCheckService:
         assert stats["interval"] == settings.health_check_interval
         assert stats["test_url"] == settings.health_check_url
 
-    @pytest.mark.asyncio
     async def test_start_service_disabled(self, health_service):
         """Test starting the service when health checks are disabled."""
         with patch.object(settings, 'health_check_enabled', False):
@@ -46,7 +57,6 @@ class TestHealthCheckService:
             assert not health_service._is_running
             assert health_service._task is None
 
-    @pytest.mark.asyncio
     async def test_start_service_enabled(self, health_service):
         """Test starting the service when health checks are enabled."""
         with patch.object(settings, 'health_check_enabled', True):
@@ -57,7 +67,6 @@ class TestHealthCheckService:
             # Clean up
             await health_service.stop()
 
-    @pytest.mark.asyncio
     async def test_stop_service(self, health_service):
         """Test stopping the service."""
         with patch.object(settings, 'health_check_enabled', True):
@@ -67,77 +76,28 @@ class TestHealthCheckService:
             await health_service.stop()
             assert not health_service._is_running
 
-    @pytest.mark.asyncio
-    async def test_successful_health_check(self, health_service):
-        """Test a successful health check."""
-        # Mock successful HTTP response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.text = "OK"
+    @pytest.mark.parametrize("response,exc,expected_success,error_substring", [
+        (_RESP_200, None, True, None),
+        (_RESP_500, None, False, "HTTP 500"),
+        (None, _TIMEOUT, False, "timeout"),
+        (None, _CONNECT_ERROR, False, "connection error"),
+    ], ids=["success", "http_error", "timeout", "connection_error"])
+    async def test_health_check_outcomes(self, health_service, monkeypatch, response, exc,
+                                         expected_success, error_substring):
+        """Test that each health check outcome updates the counters and last error."""
+        monkeypatch.setattr(httpx, "AsyncClient", lambda *args, **kwargs: make_mock_client(response, exc))
         
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
-            
-            await health_service._perform_health_check()
-            
-            assert health_service._check_count == 1
-            assert health_service._success_count == 1
-            assert health_service._failure_count == 0
-            assert health_service._last_check_success == True
-            assert health_service._last_error is None
-
-    @pytest.mark.asyncio
-    async def test_failed_health_check_http_error(self, health_service):
-        """Test a failed health check due to HTTP error."""
-        # Mock failed HTTP response
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_response.text = "Internal Server Error"
+        await health_service._perform_health_check()
         
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
-            
-            await health_service._perform_health_check()
-            
-            assert health_service._check_count == 1
-            assert health_service._success_count == 0
-            assert health_service._failure_count == 1
-            assert health_service._last_check_success == False
-            assert "HTTP 500" in health_service._last_error
-
-    @pytest.mark.asyncio
-    async def test_failed_health_check_timeout(self, health_service):
-        """Test a failed health check due to timeout."""
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                side_effect=asyncio.TimeoutError()
-            )
-            
-            await health_service._perform_health_check()
-            
-            assert health_service._check_count == 1
-            assert health_service._success_count == 0
-            assert health_service._failure_count == 1
-            assert health_service._last_check_success == False
-            assert "timeout" in health_service._last_error.lower()
-
-    @pytest.mark.asyncio
-    async def test_failed_health_check_connection_error(self, health_service):
-        """Test a failed health check due to connection error."""
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                side_effect=httpx.ConnectError("Connection failed")
-            )
-            
-            await health_service._perform_health_check()
-            
-            assert health_service._check_count == 1
-            assert health_service._success_count == 0
-            assert health_service._failure_count == 1
-            assert health_service._last_check_success == False
-            assert "connection error" in health_service._last_error.lower()
+        assert health_service._check_count == 1
+        assert health_service._success_count == int(expected_success)
+        assert health_service._failure_count == int(not expected_success)
+        assert health_service._last_check_success is expected_success
+        if error_substring is None:
+            assert health_service._last_error is None
+        else:
+            assert error_substring.lower() in health_service._last_error.lower()
 
-    @pytest.mark.asyncio
     async def test_success_rate_calculation(self, health_service):
         """Test that success rate is calculated correctly."""
         # Simulate multiple checks with mixed results
@@ -148,38 +108,32 @@ class TestHealthCheckService:
         stats = health_service.get_stats()
         assert stats["success_rate"] == 0.7
 
-    @pytest.mark.asyncio
-    async def test_health_check_request_format(self, health_service):
+    async def test_health_check_request_format(self, health_service, monkeypatch):
         """Test that the health check request is formatted correctly."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
+        client = make_mock_client(response=_RESP_200)
+        monkeypatch.setattr(httpx, "AsyncClient", lambda *args, **kwargs: client)
         
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_post = AsyncMock(return_value=mock_response)
-            mock_client.return_value.__aenter__.return_value.post = mock_post
-            
-            await health_service._perform_health_check()
-            
-            # Verify the request was made correctly
-            mock_post.assert_called_once()
-            call_args = mock_post.call_args
-            
-            # Check URL includes cache=false
-            expected_url = f"http://localhost:{settings.health_check_port}/screenshot?cache=false"
-            assert call_args[0][0] == expected_url
-            
-            # Check request data
-            request_data = call_args[1]["json"]
-            assert request_data["url"] == settings.health_check_url
-            assert request_data["format"] == "png"
-            assert request_data["width"] == 1280
-            assert request_data["height"] == 720
-            
-            # Check headers
-            headers = call_args[1]["headers"]
-            assert headers["Content-Type"] == "application/json"
+        await health_service._perform_health_check()
+        
+        # Verify the request was made correctly
+        client.post.assert_called_once()
+        call_args = client.post.call_args
+        
+        # Check URL includes cache=false
+        expected_url = f"http://localhost:{settings.health_check_port}/screenshot?cache=false"
+        assert call_args[0][0] == expected_url
+        
+        # Check request data
+        request_data = call_args[1]["json"]
+        assert request_data["url"] == settings.health_check_url
+        assert request_data["format"] == "png"
+        assert request_data["width"] == 1280
+        assert request_data["height"] == 720
+        
+        # Check headers
+        headers = call_args[1]["headers"]
+        assert headers["Content-Type"] == "application/json"
 
-    @pytest.mark.asyncio
     async def test_monitoring_integration(self, health_service):
         """Test that health check stats are integrated with monitoring."""
         with patch('app.core.monitoring.metrics_collector') as mock_metrics:
@@ -188,7 +142,6 @@ class TestHealthCheckService:
             # Verify that update_health_check_stats was called
             mock_metrics.update_health_check_stats.assert_called_once_with(stats)
 
-    @pytest.mark.asyncio
     async def test_service_restart_handling(self, health_service):
         """Test that the service can be restarted properly."""
         with patch.object(settings, 'health_check_enabled', True):
@@ -5,13 +5,39 @@ Test script to verify real IP extraction functionality.
 This script verifies that the real IP extraction code has been properly implemented.
 """
 
+import re
 import sys
 from pathlib import Path
 
 # Add the project root to the Python path
-project_root = Path(__file__).parent
+project_root = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(project_root))
 
+MIDDLEWARE_FILE = project_root / "app" / "core" / "middleware.py"
+CONFIG_FILE = project_root / "app" / "core" / "config.py"
+ENV_EXAMPLE_FILE = project_root / ".env.example"
+
+# Strings each file must contain: (pattern, label, location shown in the report)
+CODE_CHECKS = (
+    (MIDDLEWARE_FILE, (
+        ("get_real_client_ip", "get_real_client_ip function", " in middleware.py"),
+        ("x-forwarded-for", "X-Forwarded-For header support", ""),
+        ("cf-connecting-ip", "Cloudflare header support", ""),
+    )),
+    (CONFIG_FILE, (
+        ("trust_proxy_headers", "trust_proxy_headers configuration", ""),
+    )),
+    (ENV_EXAMPLE_FILE, (
+        ("TRUST_PROXY_HEADERS", "TRUST_PROXY_HEADERS", " in .env.example"),
+    )),
+)
+
+
+def find_patterns(content, patterns):
+    """Return the subset of patterns present in content using a single regex pass."""
+    regex = re.compile("|".join(map(re.escape, patterns)))
+    return set(regex.findall(content))
+
 
 def verify_code_changes():
     """Verify that the real IP extraction code has been properly implemented."""
@@ -19,54 +45,18 @@ def verify_code_changes():
     print("🧪 Verifying Real IP Extraction Implementation")
     print("=" * 60)
 
-    # Check if the middleware file has been updated
-    middleware_file = project_root / "app" / "core" / "middleware.py"
-    if middleware_file.exists():
-        with open(middleware_file, 'r') as f:
-            content = f.read()
-
-        if "get_real_client_ip" in content:
-            print("✅ get_real_client_ip function found in middleware.py")
-        else:
-            print("❌ get_real_client_ip function NOT found in middleware.py")
-
-        if "x-forwarded-for" in content:
-            print("✅ X-Forwarded-For header support found")
-        else:
-            print("❌ X-Forwarded-For header support NOT found")
-
-        if "cf-connecting-ip" in content:
-            print("✅ Cloudflare header support found")
-        else:
-            print("❌ Cloudflare header support NOT found")
-    else:
-        print("❌ middleware.py file not found")
-
-    # Check if config has been updated
-    config_file = project_root / "app" / "core" / "config.py"
-    if config_file.exists():
-        with open(config_file, 'r') as f:
-            content = f.read()
-
-        if "trust_proxy_headers" in content:
-            print("✅ trust_proxy_headers configuration found")
-        else:
-            print("❌ trust_proxy_headers configuration NOT found")
-    else:
-        print("❌ config.py file not found")
-
-    # Check if .env.example has been updated
-    env_file = project_root / ".env.example"
-    if env_file.exists():
-        with open(env_file, 'r') as f:
-            content = f.read()
-
-        if "TRUST_PROXY_HEADERS" in content:
-            print("✅ TRUST_PROXY_HEADERS found in .env.example")
-        else:
-            print("❌ TRUST_PROXY_HEADERS NOT found in .env.example")
-    else:
-        print("❌ .env.example file not found")
+    for path, checks in CODE_CHECKS:
+        if not path.exists():
+            print(f"❌ {path.name} file not found")
+            continue
+
+        content = path.read_text(encoding="utf-8")
+        found = find_patterns(content, [pattern for pattern, _, _ in checks])
+        for pattern, label, location in checks:
+            if pattern in found:
+                print(f"✅ {label} found{location}")
+            else:
+                print(f"❌ {label} NOT found{location}")
 
     print("\n📋 Test Cases That Will Work:")
     test_cases = [
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Tests for the retry system.
+
+Covers the backoff policies of RetryConfig and how RetryManager applies them.
+"""
+
+import asyncio
+import random
+import statistics
+
+import httpx
+import pytest
+
+from app.services.retry import CircuitBreaker, RetryManager, RetryConfig
+from app.core.errors import CircuitBreakerOpenError, MaxRetriesExceededError, ValidationError
+
+from tests.utils.chaos import flaky
+
+
+class TestRetryBackoff:
+    """Test backoff delays produced by RetryConfig and RetryManager."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.retry_config = RetryConfig(
+            max_retries=5,
+            base_delay=0.1,
+            max_delay=2.0,
+            jitter=0.1,
+            rng=random.Random(1234)
+        )
+        self.retry_manager = RetryManager(
+            retry_config=self.retry_config,
+            name="test_retry_system"
+        )
+
+    @pytest.mark.parametrize("jitter_mode", ["decorrelated", "full"])
+    async def test_retry_with_exponential_backoff(self, monkeypatch, jitter_mode):
+        """Test that backoff delays are jittered and grow exponentially on average."""
+        delays = []
+
+        async def record_sleep(delay):
+            delays.append(delay)
+
+        monkeypatch.setattr("app.services.retry.asyncio.sleep", record_sleep)
+
+        # Collect the delay before each retry over many seeded runs
+        samples = [[] for _ in range(3)]
+        for seed in range(50):
+            retry_manager = RetryManager(
+                retry_config=RetryConfig(max_retries=3, base_delay=0.1, max_delay=2.0, jitter=0.1,
+                                         jitter_mode=jitter_mode, rng=random.Random(seed)),
+                name="test_retry_system"
+            )
+            delays.clear()
+            with pytest.raises(MaxRetriesExceededError):
+                await retry_manager.execute(flaky(fail_first=None))
+            for retry_count, delay in enumerate(delays):
+                samples[retry_count].append(delay)
+
+        assert all(len(sample) == 50 for sample in samples)
+        # Jitter spreads the delays out rather than pinning them to one value
+        assert statistics.pstdev(samples[1]) > 0.1 * statistics.mean(samples[1])
+        # and the delays still grow exponentially on average
+        assert statistics.mean(samples[2]) > 1.5 * statistics.mean(samples[1])
+
+    def test_seeded_delays_are_reproducible(self):
+        """Test that configs sharing a seed produce the same delay sequence."""
+        def delay_sequence(seed):
+            config = RetryConfig(max_retries=5, base_delay=0.1, max_delay=2.0, jitter=0.1,
+                                 rng=random.Random(seed))
+            delays, prev_delay = [], None
+            for retry_count in range(5):
+                prev_delay = config.get_delay(retry_count, prev_delay=prev_delay)
+                delays.append(prev_delay)
+            return delays
+
+        assert delay_sequence(42) == delay_sequence(42)
+        assert delay_sequence(42) != delay_sequence(43)
+
+    def test_delay_never_exceeds_max_delay(self):
+        """Test that decorrelated delays are capped at max_delay."""
+        assert self.retry_config.get_delay(10, prev_delay=100.0) <= self.retry_config.max_delay
+
+    def test_full_jitter_bounds(self):
+        """Test that full jitter draws from [0, exponential delay]."""
+        config = RetryConfig(max_retries=5, base_delay=0.1, max_delay=2.0, jitter=0.1,
+                             jitter_mode="full", rng=random.Random(7))
+        for retry_count in range(5):
+            delay = config.get_delay(retry_count)
+            assert 0 <= delay <= min(config.max_delay, config.base_delay * 2 ** retry_count)
+
+    def test_exponential_mode_keeps_symmetric_jitter(self):
+        """Test that exponential mode applies the symmetric jitter band."""
+        config = RetryConfig(max_retries=5, base_delay=0.1, max_delay=2.0, jitter=0.1,
+                             jitter_mode="exponential", rng=random.Random(7))
+        for retry_count in range(5):
+            expected = min(config.max_delay, config.base_delay * 2 ** retry_count)
+            delay = config.get_delay(retry_count)
+            assert expected * 0.9 <= delay <= expected * 1.1
+
+
+class TestRetryClassification:
+    """Test which errors RetryManager retries and which it fails fast on."""
+
+    async def test_abort_on_validation_error(self):
+        """Test that abort_on errors are raised after one attempt without tripping the breaker."""
+        circuit_breaker = CircuitBreaker(threshold=1, reset_time=60, name="test_abort_on")
+        retry_manager = RetryManager(
+            retry_config=RetryConfig(max_retries=3, base_delay=0.0, max_delay=0.0, jitter=0.0),
+            circuit_breaker=circuit_breaker,
+            name="test_abort_on"
+        )
+        operation = flaky(fail_first=None, fault="InvalidRequest")
+
+        with pytest.raises(ValidationError):
+            await retry_manager.execute(operation)
+
+        assert operation.calls == 1
+        assert circuit_breaker.failure_count == 0
+        assert circuit_breaker.state == "closed"
+
+    @pytest.mark.parametrize("status_code,attempts,expected", [
+        (404, 1, httpx.HTTPStatusError),
+        (408, 4, MaxRetriesExceededError),
+        (429, 4, MaxRetriesExceededError),
+        (503, 4, MaxRetriesExceededError),
+    ])
+    async def test_abort_on_client_status(self, status_code, attempts, expected):
+        """Test that 4xx responses fail fast while rate limits and 5xx are retried."""
+        retry_manager = RetryManager(
+            retry_config=RetryConfig(max_retries=3, base_delay=0.0, max_delay=0.0, jitter=0.0),
+            name="test_abort_on_status"
+        )
+        calls = 0
+
+        async def operation():
+            nonlocal calls
+            calls += 1
+            request = httpx.Request("GET", "https://example.com")
+            response = httpx.Response(status_code, request=request)
+            raise httpx.HTTPStatusError("status error", request=request, response=response)
+
+        with pytest.raises(expected):
+            await retry_manager.execute(operation)
+
+        assert calls == attempts
+
+    async def test_retry_failure(self):
+        """Test that retry_on errors are retried until max_retries is exhausted."""
+        retry_manager = RetryManager(
+            retry_config=RetryConfig(max_retries=3, base_delay=0.0, max_delay=0.0, jitter=0.0),
+            name="test_retry_on"
+        )
+        operation = flaky(fail_first=None, fault="ConnectionReset")
+
+        with pytest.raises(MaxRetriesExceededError):
+            await retry_manager.execute(operation)
+
+        assert operation.calls == retry_manager.retry_config.max_retries + 1
+
+    @pytest.mark.parametrize("fault, attempts", [
+        ("NetworkTimeout", 4),
+        ("Http5xx", 4),
+        ("Http429", 4),
+        ("InvalidRequest", 1),
+    ])
+    async def test_fault_types(self, fault, attempts):
+        """Test that transient faults are retried and invalid requests are not."""
+        retry_manager = RetryManager(
+            retry_config=RetryConfig(max_retries=3, base_delay=0.0, max_delay=0.0, jitter=0.0),
+            name="test_fault_types"
+        )
+        operation = flaky(fail_first=None, fault=fault)
+
+        with pytest.raises(Exception):
+            await retry_manager.execute(operation)
+
+        assert operation.calls == attempts
+
+    async def test_seeded_faults_are_reproducible(self):
+        """Test that random faults after the first failures follow the seed."""
+        retry_manager = RetryManager(
+            retry_config=RetryConfig(max_retries=10, base_delay=0.0, max_delay=0.0, jitter=0.0),
+            name="test_seeded_faults"
+        )
+
+        async def attempts(seed):
+            operation = flaky(fail_first=1, failure_rate=0.5, seed=seed)
+            await retry_manager.execute(operation)
+            return operation.calls
+
+        assert await attempts(3) == await attempts(3)
+
+
+class TestCircuitBreakerRecovery:
+    """Test that a recovering circuit breaker lets a single probe through."""
+
+    @staticmethod
+    async def trip(threshold=3, reset_time=0.2):
+        """Return a circuit breaker opened by threshold failures."""
+        circuit_breaker = CircuitBreaker(threshold=threshold, reset_time=reset_time, name="test_recovery")
+        for _ in range(threshold):
+            await circuit_breaker.record_failure()
+        assert circuit_breaker.state == "open"
+        return circuit_breaker
+
+    async def test_breaker_concurrent_half_open(self):
+        """Test that only one of many concurrent callers probes a half-open circuit."""
+        circuit_breaker = await self.trip()
+        await asyncio.sleep(0.25)
+
+        results = await asyncio.gather(*[circuit_breaker.can_execute() for _ in range(50)])
+
+        assert sum(results) == 1
+        assert circuit_breaker.state == "half-open"
+
+    async def test_probe_outcome_decides_state(self):
+        """Test that a successful probe closes the circuit and a failed one re-opens it."""
+        circuit_breaker = await self.trip()
+        await asyncio.sleep(0.25)
+
+        assert await circuit_breaker.can_execute()
+        await circuit_breaker.record_failure()
+        assert circuit_breaker.state == "open"
+        assert not await circuit_breaker.can_execute()
+
+        await asyncio.sleep(0.25)
+        assert await circuit_breaker.can_execute()
+        await circuit_breaker.record_success()
+        assert circuit_breaker.state == "closed"
+        assert all(await asyncio.gather(*[circuit_breaker.can_execute() for _ in range(10)]))
+
+    async def test_aborted_probe_releases_half_open(self):
+        """Test that a probe ending in an abort_on error lets the next probe through."""
+        circuit_breaker = await self.trip()
+        retry_manager = RetryManager(
+            retry_config=RetryConfig(max_retries=3, base_delay=0.0, max_delay=0.0, jitter=0.0),
+            circuit_breaker=circuit_breaker,
+            name="test_abort_probe"
+        )
+        await asyncio.sleep(0.25)
+
+        with pytest.raises(ValidationError):
+            await retry_manager.execute(flaky(fail_first=None, fault="InvalidRequest"))
+
+        assert circuit_breaker.state == "half-open"
+        assert await circuit_breaker.can_execute()
+
+    async def test_cancelled_probe_releases_half_open(self):
+        """Test that a probe cancelled mid-flight lets the next caller through."""
+        circuit_breaker = await self.trip()
+        retry_manager = RetryManager(
+            retry_config=RetryConfig(max_retries=3, base_delay=0.0, max_delay=0.0, jitter=0.0),
+            circuit_breaker=circuit_breaker,
+            name="test_cancel_probe"
+        )
+        await asyncio.sleep(0.25)
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.sleep(60)
+
+        probe = asyncio.create_task(retry_manager.execute(hang))
+        await started.wait()
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        assert circuit_breaker.state == "half-open"
+        assert await circuit_breaker.can_execute()
+
+    async def test_failures_while_open_are_counted(self):
+        """Test that failures recorded while open still count and refresh the reset window."""
+        circuit_breaker = CircuitBreaker(threshold=3, reset_time=60, name="test_burst")
+
+        await asyncio.gather(*[circuit_breaker.record_failure() for _ in range(1000)])
+
+        stats = circuit_breaker.get_state()["stats"]
+        assert circuit_breaker.state == "open"
+        assert stats["failures"] == 1000
+        assert circuit_breaker.failure_count == 1000
+
+        opened_at = circuit_breaker.last_failure_time
+        await asyncio.sleep(0.01)
+        await circuit_breaker.record_failure()
+        assert circuit_breaker.last_failure_time > opened_at
+
+    async def test_retry_with_circuit_breaker(self):
+        """Test that an open breaker rejects navigation with CircuitBreakerOpenError, not a failure."""
+        circuit_breaker = await self.trip(reset_time=60)
+        retry_manager = RetryManager(
+            retry_config=RetryConfig(max_retries=3, base_delay=0.0, max_delay=0.0, jitter=0.0),
+            circuit_breaker=circuit_breaker,
+            name="test_breaker_open"
+        )
+        operation = flaky(fail_first=0)
+
+        with pytest.raises(CircuitBreakerOpenError):
+            await retry_manager.execute(operation, operation_name="navigate_to_url")
+
+        assert operation.calls == 0
+        assert retry_manager.get_stats()["circuit_breaker_rejections"] == 1
+        assert retry_manager.get_stats()["failures"] == 0
+
+
+class TestRetryConcurrency:
+    """Test that retry backoff does not block the event loop."""
+
+    async def test_async_backoff_nonblocking(self):
+        """Test that concurrent retries overlap their backoff instead of serializing."""
+        # base_delay == max_delay pins every backoff to exactly 0.2s
+        retry_manager = RetryManager(
+            retry_config=RetryConfig(max_retries=2, base_delay=0.2, max_delay=0.2, jitter=0.0),
+            name="test_nonblocking"
+        )
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        await retry_manager.execute(flaky(fail_first=1))
+        single_elapsed = loop.time() - start
+
+        # Count loop iterations while the retries are backing off
+        heartbeats = 0
+        stop = asyncio.Event()
+
+        async def heartbeat():
+            nonlocal heartbeats
+            while not stop.is_set():
+                heartbeats += 1
+                await asyncio.sleep(0.01)
+
+        heartbeat_task = asyncio.create_task(heartbeat())
+        start = loop.time()
+        results = await asyncio.gather(*(
+            asyncio.create_task(retry_manager.execute(flaky(fail_first=1)))
+            for _ in range(10)
+        ))
+        concurrent_elapsed = loop.time() - start
+        stop.set()
+        await heartbeat_task
+
+        assert results == ["success"] * 10
+        assert concurrent_elapsed < single_elapsed * 1.5
+        assert heartbeats >= 5, "event loop did not run while retries were backing off"
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the /screenshot endpoint.
+
+Playwright and storage are mocked out so the request pipeline is exercised
+deterministically without a browser; the real capture path is covered by
+test_screenshot_service_integration.py.
+"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.core.config import settings
+from app.services.cache import cache_service
+
+STORAGE_URL = "https://cdn.example.com/x.png"
+PAYLOAD = {"url": "https://example.com", "width": 1280, "height": 720, "format": "png"}
+
+
+@pytest.fixture
+def mock_screenshot(monkeypatch, tmp_path):
+    """Replace the browser capture and storage upload with canned results."""
+    capture = AsyncMock(return_value=str(tmp_path / "x.png"))
+    monkeypatch.setattr("app.services.screenshot.ScreenshotService.capture_screenshot", capture)
+    monkeypatch.setattr("app.services.storage.storage_service.upload_file", AsyncMock(return_value=STORAGE_URL))
+    # Return the storage URL directly and skip the queue, which is not running without the lifespan
+    monkeypatch.setattr(settings, "storage_mode", "local")
+    monkeypatch.setattr(settings, "use_imgproxy_for_local", False)
+    monkeypatch.setattr(settings, "enable_request_queue", False)
+    return capture
+
+
+def test_screenshot_endpoint(client, mock_screenshot):
+    """A valid request is captured once and answered with the stored image URL."""
+    response = client.post("/screenshot", params={"cache": "false"}, json=PAYLOAD)
+
+    assert response.status_code == 200
+    assert response.json() == {"url": STORAGE_URL}
+    # pydantic normalizes the bare host URL with a trailing slash
+    mock_screenshot.assert_awaited_once_with(
+        url="https://example.com/", width=PAYLOAD["width"], height=PAYLOAD["height"], format=PAYLOAD["format"]
+    )
+
+
+def test_screenshot_endpoint_cached(client, mock_screenshot, monkeypatch):
+    """A cached screenshot is returned without capturing again."""
+    monkeypatch.setattr(cache_service, "get", AsyncMock(return_value=STORAGE_URL))
+
+    response = client.post("/screenshot", json=PAYLOAD)
+
+    assert response.status_code == 200
+    assert response.json() == {"url": STORAGE_URL}
+    mock_screenshot.assert_not_awaited()
@@ -9,7 +9,6 @@ focusing on end-to-end functionality and resource management.
 import asyncio
 import os
 import pytest
-import pytest_asyncio
 import time
 from typing import Dict, Any, List
 import uuid
@@ -17,10 +16,6 @@ import uuid
 from app.services.screenshot import screenshot_service
 from app.core.config import settings
 
-from tests.utils.async_test_utils import (
-    cleanup_async_resources
-)
-
 # Test-specific environment variables for better control over test behavior
 SCREENSHOT_TEST_TIMEOUT = float(os.getenv("SCREENSHOT_TEST_TIMEOUT", "45.0"))  # Increased from 30 to 45 seconds
 CONCURRENT_TEST_TIMEOUT = float(os.getenv("CONCURRENT_TEST_TIMEOUT", "90.0"))  # Increased from 60 to 90 seconds
@@ -29,56 +24,63 @@ CONCURRENT_TEST_TIMEOUT = float(os.getenv("CONCURRENT_TEST_TIMEOUT", "90.0"))  #
 SLOW = pytest.mark.slow  # Tests that take a long time to run
 NETWORK = pytest.mark.network  # Tests that depend on external network resources
 
-@pytest_asyncio.fixture(autouse=True)
-async def reset_circuit_breakers_fixture():
-    """Reset circuit breakers before each test to ensure test isolation."""
-    # Reset before test
-    await screenshot_service.reset_circuit_breakers()
+# Default capture parameters shared by the tests: url, width, height, format
+DEFAULT_PARAMS = ("https://example.com", 1280, 720, "png")
 
-    # Run the test
-    yield
+USES_CIRCUIT_BREAKER = pytest.mark.uses_circuit_breaker  # Tests that trip or depend on breaker state
+
+
+def circuit_breakers_touched() -> bool:
+    """Check whether either circuit breaker has recorded failures or left the closed state."""
+    # Read the breakers directly rather than building the full get_retry_stats() snapshot after every test
+    breakers = (screenshot_service._browser_circuit_breaker, screenshot_service._navigation_circuit_breaker)
+    return any(breaker.failure_count or breaker.state != "closed" for breaker in breakers)
+
+
+async def wait_until(predicate, timeout: float = 1.0, interval: float = 0.01) -> None:
+    """Poll predicate until it holds or timeout seconds pass, leaving the assertions to the caller."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate() and loop.time() < deadline:
+        await asyncio.sleep(interval)
 
-    # Reset after test
-    await screenshot_service.reset_circuit_breakers()
 
+@pytest.fixture(autouse=True)
+async def reset_circuit_breakers_fixture(request, started_screenshot_service):
+    """Reset circuit breakers only where a test needs or disturbed them, to keep tests isolated."""
+    # Start from closed breakers only for tests that depend on their state
+    if request.node.get_closest_marker("uses_circuit_breaker"):
+        await screenshot_service.reset_circuit_breakers()
 
-@pytest.mark.asyncio
-async def test_screenshot_service_startup_shutdown():
-    """Test screenshot service startup and shutdown."""
-    # Ensure service is initialized
-    await screenshot_service.startup()
+    yield
+
+    # Skip the reset when the test left both breakers untouched
+    if circuit_breakers_touched():
+        await screenshot_service.reset_circuit_breakers()
 
+
+async def test_screenshot_service_startup():
+    """Test screenshot service startup."""
+    # The service has already been started by the session fixture
     # Get browser pool stats
     stats = screenshot_service.get_pool_stats()
+    min_size = settings.browser_pool_min_size
 
     # Verify browser pool is initialized
-    assert stats["size"] >= settings.browser_pool_min_size
-    assert stats["available"] >= settings.browser_pool_min_size
+    assert stats["size"] >= min_size
+    assert stats["available"] >= min_size
 
     # Verify cleanup task is running
     assert screenshot_service._cleanup_task is not None
     assert not screenshot_service._cleanup_task.done()
 
-    # Shutdown service
-    await screenshot_service.cleanup()
-
-    # Verify cleanup task is cancelled
-    assert screenshot_service._cleanup_task.done()
 
-    # Restart service for other tests
-    await screenshot_service.startup()
-
-
-@pytest.mark.asyncio
 @NETWORK
 @SLOW
 async def test_capture_screenshot_end_to_end():
     """Test end-to-end screenshot capture with the refactored service."""
     # Test parameters
-    url = "https://example.com"
-    width = 1280
-    height = 720
-    format = "png"
+    url, width, height, format = DEFAULT_PARAMS
 
     # Capture screenshot with timeout
     try:
@@ -103,11 +105,7 @@ async def test_capture_screenshot_end_to_end():
         if os.path.exists(filepath):
             os.remove(filepath)
 
-    # Cleanup resources
-    await cleanup_async_resources()
 
-
-@pytest.mark.asyncio
 @NETWORK
 @SLOW
 async def test_concurrent_screenshot_captures():
@@ -120,56 +118,38 @@ async def test_concurrent_screenshot_captures():
         "https://mozilla.org",
         "https://python.org"
     ]
-    width = 1280
-    height = 720
-    format = "png"
-
-    # Create tasks for concurrent screenshot captures
-    tasks = []
-    for url in urls:
-        task = asyncio.create_task(
-            screenshot_service.capture_screenshot(url, width, height, format)
-        )
-        tasks.append(task)
+    _, width, height, format = DEFAULT_PARAMS
 
-    # Wait for all tasks to complete with a timeout
-    try:
-        filepaths = await asyncio.wait_for(
-            asyncio.gather(*tasks),
-            timeout=CONCURRENT_TEST_TIMEOUT  # Use configurable timeout for concurrent tasks
-        )
-    except asyncio.TimeoutError:
-        # Cancel any remaining tasks
-        for task in tasks:
-            if not task.done():
-                task.cancel()
-        pytest.skip(f"Concurrent screenshot captures timed out after {CONCURRENT_TEST_TIMEOUT} seconds - skipping test in CI environment")
-        return  # Exit the test if timeout occurs
-
-    try:
-        # Verify all screenshots were created
-        for filepath in filepaths:
+    async def capture_and_verify(url):
+        # Verify and remove each screenshot as soon as its capture finishes
+        filepath = await screenshot_service.capture_screenshot(url, width, height, format)
+        try:
             assert os.path.exists(filepath)
             assert os.path.getsize(filepath) > 0
             assert filepath.endswith(f".{format}")
-    finally:
-        # Clean up the files
-        for filepath in filepaths:
+        finally:
             if os.path.exists(filepath):
                 os.remove(filepath)
 
+    # The task group cancels the remaining captures if one fails or the timeout expires
+    try:
+        async with asyncio.timeout(CONCURRENT_TEST_TIMEOUT):
+            async with asyncio.TaskGroup() as tg:
+                for url in urls:
+                    tg.create_task(capture_and_verify(url))
+    except TimeoutError:
+        pytest.skip(f"Concurrent screenshot captures timed out after {CONCURRENT_TEST_TIMEOUT} seconds - skipping test in CI environment")
+
     # Get browser pool stats after concurrent captures
     stats = screenshot_service.get_pool_stats()
+    max_size = settings.browser_pool_max_size
 
     # Verify browser pool scaled appropriately
-    assert stats["size"] >= min(len(urls), settings.browser_pool_max_size)
-
-    # Cleanup resources
-    await cleanup_async_resources()
+    assert stats["size"] >= min(len(urls), max_size)
 
 
-@pytest.mark.asyncio
 @SLOW
+@USES_CIRCUIT_BREAKER
 async def test_resource_tracking_during_errors():
     """Test resource tracking and cleanup during errors."""
     # Get initial resource counts
@@ -178,9 +158,7 @@ async def test_resource_tracking_during_errors():
 
     # Test with invalid URL to trigger error
     invalid_url = "invalid-url-that-will-fail"
-    width = 1280
-    height = 720
-    format = "png"
+    _, width, height, format = DEFAULT_PARAMS
 
     # Attempt to capture screenshot (should fail) with timeout
     with pytest.raises(Exception):
@@ -193,8 +171,11 @@ async def test_resource_tracking_during_errors():
             pytest.skip(f"Screenshot capture timed out after {SCREENSHOT_TEST_TIMEOUT} seconds - skipping test in CI environment")
             return  # Exit the test if timeout occurs
 
-    # Wait a moment for async cleanup
-    await asyncio.sleep(1)
+    # Wait for async cleanup to bring the tracked resources back to their initial counts
+    await wait_until(
+        lambda: len(screenshot_service._active_resources["pages"]) == initial_active_pages
+        and len(screenshot_service._active_resources["contexts"]) == initial_active_contexts
+    )
 
     # Verify no resources were leaked
     current_active_pages = len(screenshot_service._active_resources["pages"])
@@ -203,33 +184,27 @@ async def test_resource_tracking_during_errors():
     assert current_active_pages == initial_active_pages
     assert current_active_contexts == initial_active_contexts
 
-    # Cleanup resources
-    await cleanup_async_resources()
 
-
-@pytest.mark.asyncio
 @NETWORK
 @SLOW
 async def test_cleanup_temp_files_integration():
     """Test temp file cleanup integration."""
     # Create some test screenshots
-    url = "https://example.com"
-    width = 1280
-    height = 720
-    format = "png"
-
-    # Capture multiple screenshots with timeout
-    filepaths = []
-    for _ in range(3):
-        try:
-            filepath = await asyncio.wait_for(
-                screenshot_service.capture_screenshot(url, width, height, format),
-                timeout=SCREENSHOT_TEST_TIMEOUT  # Use configurable timeout
-            )
-            filepaths.append(filepath)
-        except asyncio.TimeoutError:
-            pytest.skip(f"Screenshot capture timed out after {SCREENSHOT_TEST_TIMEOUT} seconds - skipping test in CI environment")
-            return  # Exit the test if timeout occurs
+    url, width, height, format = DEFAULT_PARAMS
+
+    # Capture multiple screenshots concurrently with a single timeout
+    tasks = [
+        screenshot_service.capture_screenshot(url, width, height, format)
+        for _ in range(3)
+    ]
+    try:
+        filepaths = await asyncio.wait_for(
+            asyncio.gather(*tasks),
+            timeout=SCREENSHOT_TEST_TIMEOUT  # Use configurable timeout
+        )
+    except asyncio.TimeoutError:
+        # wait_for cancels the gather, which cancels the outstanding captures
+        pytest.skip(f"Screenshot captures timed out after {SCREENSHOT_TEST_TIMEOUT} seconds - skipping test in CI environment")
 
     # Verify files exist
     for filepath in filepaths:
@@ -237,8 +212,7 @@ async def test_cleanup_temp_files_integration():
 
     # Modify file timestamps to make them old
     old_time = time.time() - (25 * 3600)  # 25 hours old
-    for filepath in filepaths:
-        os.utime(filepath, (old_time, old_time))
+    await asyncio.gather(*(asyncio.to_thread(os.utime, filepath, (old_time, old_time)) for filepath in filepaths))
 
     # Run cleanup
     removed_count = await screenshot_service._cleanup_temp_files()
@@ -248,23 +222,13 @@ async def test_cleanup_temp_files_integration():
     for filepath in filepaths:
         assert not os.path.exists(filepath)
 
-    # Cleanup resources
-    await cleanup_async_resources()
 
-
-@pytest.mark.asyncio
 @NETWORK
 @SLOW
 async def test_retry_mechanism_integration():
     """Test retry mechanism integration."""
     # Test parameters
-    url = "https://example.com"
-    width = 1280
-    height = 720
-    format = "png"
-
-    # Get initial retry stats
-    initial_stats = screenshot_service.get_retry_stats()
+    url, width, height, format = DEFAULT_PARAMS
 
     # Capture screenshot with timeout
     try:
@@ -293,45 +257,42 @@ async def test_retry_mechanism_integration():
     assert "browser_retry" in updated_stats
     assert "circuit_breakers" in updated_stats
 
-    # Cleanup resources
-    await cleanup_async_resources()
 
-
-@pytest.mark.asyncio
+@USES_CIRCUIT_BREAKER
 async def test_circuit_breaker_reset():
     """Test that circuit breakers can be reset properly."""
-    # Get initial circuit breaker state
-    initial_stats = screenshot_service.get_retry_stats()
-    initial_browser_state = initial_stats["circuit_breakers"]["browser"]["state"]
-    initial_navigation_state = initial_stats["circuit_breakers"]["navigation"]["state"]
-
-    # Manually trip the circuit breakers by simulating failures
     threshold = settings.circuit_breaker_threshold
+    nav_cb = screenshot_service._navigation_circuit_breaker
+    br_cb = screenshot_service._browser_circuit_breaker
 
-    # Trip the navigation circuit breaker
-    for _ in range(threshold):
-        await screenshot_service._navigation_circuit_breaker.record_failure()
-
-    # Trip the browser circuit breaker
-    for _ in range(threshold):
-        await screenshot_service._browser_circuit_breaker.record_failure()
+    # Trip both circuit breakers; record_failure serializes on each breaker's own lock
+    await asyncio.gather(*(breaker.record_failure() for breaker in (nav_cb, br_cb) for _ in range(threshold)))
 
     # Verify circuit breakers are open
-    tripped_stats = screenshot_service.get_retry_stats()
-    assert tripped_stats["circuit_breakers"]["browser"]["state"] == "open"
-    assert tripped_stats["circuit_breakers"]["navigation"]["state"] == "open"
+    tripped = screenshot_service.get_retry_stats()["circuit_breakers"]
+    assert tripped["browser"]["state"] == "open"
+    assert tripped["navigation"]["state"] == "open"
 
     # Reset circuit breakers
     await screenshot_service.reset_circuit_breakers()
 
     # Verify circuit breakers are closed again
-    reset_stats = screenshot_service.get_retry_stats()
-    assert reset_stats["circuit_breakers"]["browser"]["state"] == "closed"
-    assert reset_stats["circuit_breakers"]["navigation"]["state"] == "closed"
+    reset = screenshot_service.get_retry_stats()["circuit_breakers"]
+    assert reset["browser"]["state"] == "closed"
+    assert reset["navigation"]["state"] == "closed"
+
 
-    # Cleanup resources
-    await cleanup_async_resources()
 
+# Keep this test last in the module: it stops the session-wide service
+# rather than restarting it; the session fixture's teardown cleanup is
+# safe to repeat on a stopped service
+async def test_screenshot_service_shutdown(started_screenshot_service):
+    """Test screenshot service shutdown."""
+    # Shutdown service
+    await screenshot_service.cleanup()
+
+    # Verify cleanup task is cancelled
+    assert screenshot_service._cleanup_task.done()
 
 if __name__ == "__main__":
     asyncio.run(pytest.main(['-xvs', __file__]))
@@ -4,6 +4,9 @@ Simple test to verify the async context manager fix without dependencies.
 """
 
 import asyncio
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+
+import pytest
 
 
 class MockService:
@@ -40,6 +43,8 @@ class MockService:
 class MockPage:
     """Mock page that simulates Playwright page."""
     
+    __slots__ = ("closed",)
+    
     def __init__(self):
         self.closed = False
     
@@ -53,192 +58,106 @@ class MockPage:
 class MockContext:
     """Mock context that simulates Playwright context."""
     
+    __slots__ = ()
+    
     async def new_page(self):
         return MockPage()
 
 
-# Define the context managers directly (copied from the fixed implementation)
-class TabContextManager:
+# Define the context managers directly, as generator-based equivalents of the fixed implementation
+@asynccontextmanager
+async def tab_context(screenshot_service, width: int, height: int):
     """Async context manager for tab operations."""
-    
-    def __init__(self, screenshot_service, width: int, height: int):
-        self.screenshot_service = screenshot_service
-        self.width = width
-        self.height = height
-        self.page = None
-        self.browser_index = None
-        self.tab_info = None
-    
-    async def __aenter__(self):
-        """Enter the async context manager."""
+    # Get a tab from the pool
+    page, browser_index, tab_info = await screenshot_service._get_tab(width, height)
+    if page is None or browser_index is None or tab_info is None:
+        raise RuntimeError("Failed to get tab from pool")
+
+    # The tab is healthy unless the body raised
+    is_healthy = True
+    try:
+        yield page, browser_index, tab_info
+    except BaseException:
+        is_healthy = False
+        raise
+    finally:
+        # Only the failures expected from handing a tab back are logged and dropped;
+        # anything else, including cancellation, propagates
         try:
-            # Get a tab from the pool
-            self.page, self.browser_index, self.tab_info = await self.screenshot_service._get_tab(
-                self.width, self.height
-            )
-            if self.page is None or self.browser_index is None or self.tab_info is None:
-                raise RuntimeError("Failed to get tab from pool")
-            
-            return self.page, self.browser_index, self.tab_info
-        except Exception as e:
-            # Clean up if needed
-            if self.page is not None and self.browser_index is not None and self.tab_info is not None:
-                try:
-                    await self.screenshot_service._return_tab(
-                        self.page, self.browser_index, self.tab_info, is_healthy=False
-                    )
-                except Exception as cleanup_error:
-                    self.screenshot_service.logger.error(
-                        f"Error returning tab during exception handling: {str(cleanup_error)}"
-                    )
-            raise
-    
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Exit the async context manager."""
-        if self.page is not None and self.browser_index is not None and self.tab_info is not None:
-            try:
-                # Determine if the tab is healthy based on whether an exception occurred
-                is_healthy = exc_type is None
-                await self.screenshot_service._return_tab(
-                    self.page, self.browser_index, self.tab_info, is_healthy=is_healthy
-                )
-            except Exception as e:
-                self.screenshot_service.logger.error(f"Error returning tab during cleanup: {str(e)}", {
-                    "error": str(e),
-                    "error_type": type(e).__name__,
-                    "browser_index": self.browser_index
-                })
+            await screenshot_service._return_tab(page, browser_index, tab_info, is_healthy=is_healthy)
+        except (TimeoutError, RuntimeError) as e:
+            screenshot_service.logger.error(f"Error returning tab during cleanup: {str(e)}", {
+                "error": str(e),
+                "error_type": type(e).__name__,
+                "browser_index": browser_index
+            })
 
 
-class ContextManager:
+@asynccontextmanager
+async def browser_context(screenshot_service, width: int, height: int):
     """Async context manager for traditional context operations."""
-    
-    def __init__(self, screenshot_service, width: int, height: int):
-        self.screenshot_service = screenshot_service
-        self.width = width
-        self.height = height
-        self.context = None
-        self.browser_index = None
-        self.page = None
-    
-    async def __aenter__(self):
-        """Enter the async context manager."""
-        try:
-            # Get a context from the pool
-            self.context, self.browser_index = await self.screenshot_service._get_context(
-                self.width, self.height
-            )
-            if self.context is None or self.browser_index is None:
-                raise RuntimeError("Failed to get browser context")
-
-            # Create a new page (mock implementation)
-            self.page = MockPage()
-            await self.screenshot_service._track_resource("page", self.page)
-
-            return self.context, self.browser_index, self.page
-        except Exception as e:
-            # Clean up if needed
-            if self.page is not None and not self.page.is_closed():
-                try:
-                    await asyncio.wait_for(self.page.close(), timeout=3.0)
-                    await self.screenshot_service._untrack_resource("page", self.page)
-                except Exception as cleanup_error:
-                    self.screenshot_service.logger.warning(f"Error closing page during exception handling: {str(cleanup_error)}")
-
-            if self.context is not None and self.browser_index is not None:
-                try:
-                    await self.screenshot_service._return_context(self.context, self.browser_index, is_healthy=False)
-                except Exception as cleanup_error:
-                    self.screenshot_service.logger.error(f"Error returning context during exception handling: {str(cleanup_error)}")
-            raise
-    
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Exit the async context manager."""
+    # Get a context from the pool
+    context, browser_index = await screenshot_service._get_context(width, height)
+    if context is None or browser_index is None:
+        raise RuntimeError("Failed to get browser context")
+
+    # The context is healthy unless page setup or the body raised
+    is_healthy = True
+    page = None
+    try:
+        # Create a new page (mock implementation)
+        page = MockPage()
+        await screenshot_service._track_resource("page", page)
+
+        yield context, browser_index, page
+    except BaseException:
+        is_healthy = False
+        raise
+    finally:
         # Clean up page
-        if self.page is not None and not self.page.is_closed():
+        if page is not None and not page.is_closed():
             try:
-                await asyncio.wait_for(self.page.close(), timeout=3.0)
-                await self.screenshot_service._untrack_resource("page", self.page)
+                await asyncio.wait_for(page.close(), timeout=3.0)
+                await screenshot_service._untrack_resource("page", page)
             except Exception as e:
-                self.screenshot_service.logger.warning(f"Error closing page during cleanup: {str(e)}")
+                screenshot_service.logger.warning(f"Error closing page during cleanup: {str(e)}")
 
         # Return context
-        if self.context is not None and self.browser_index is not None:
-            try:
-                # Determine if the context is healthy based on whether an exception occurred
-                is_healthy = exc_type is None
-                await self.screenshot_service._return_context(self.context, self.browser_index, is_healthy)
-            except Exception as e:
-                self.screenshot_service.logger.error(f"Error returning context during cleanup: {str(e)}", {
-                    "error": str(e),
-                    "error_type": type(e).__name__,
-                    "browser_index": self.browser_index
-                })
+        try:
+            await screenshot_service._return_context(context, browser_index, is_healthy)
+        except Exception as e:
+            screenshot_service.logger.error(f"Error returning context during cleanup: {str(e)}", {
+                "error": str(e),
+                "error_type": type(e).__name__,
+                "browser_index": browser_index
+            })
 
 
-async def test_context_managers():
-    """Test both context managers."""
-    print("🧪 Testing Fixed Context Managers")
-    print("=" * 50)
-    
-    service = MockService()
-    
-    # Test TabContextManager
-    print("📑 Testing TabContextManager...")
-    try:
-        async with TabContextManager(service, 1280, 720) as (page, browser_index, tab_info):
-            print(f"✅ TabContextManager works: page={page}, browser_index={browser_index}")
-        print("✅ TabContextManager test passed")
-        tab_test_passed = True
-    except Exception as e:
-        print(f"❌ TabContextManager test failed: {e}")
-        tab_test_passed = False
-    
-    # Test ContextManager
-    print("\n📑 Testing ContextManager...")
-    try:
-        async with ContextManager(service, 1280, 720) as (context, browser_index, page):
-            print(f"✅ ContextManager works: context={context}, browser_index={browser_index}")
-        print("✅ ContextManager test passed")
-        context_test_passed = True
-    except Exception as e:
-        print(f"❌ ContextManager test failed: {e}")
-        context_test_passed = False
-    
-    # Test protocol compliance
-    print("\n🔍 Testing async context manager protocol...")
-    tab_cm = TabContextManager(service, 1280, 720)
-    context_cm = ContextManager(service, 1280, 720)
-    
-    tab_protocol_ok = hasattr(tab_cm, '__aenter__') and hasattr(tab_cm, '__aexit__')
-    context_protocol_ok = hasattr(context_cm, '__aenter__') and hasattr(context_cm, '__aexit__')
-    
-    print(f"TabContextManager protocol: {'✅ OK' if tab_protocol_ok else '❌ FAIL'}")
-    print(f"ContextManager protocol: {'✅ OK' if context_protocol_ok else '❌ FAIL'}")
-    
-    # Summary
-    all_passed = tab_test_passed and context_test_passed and tab_protocol_ok and context_protocol_ok
-    
-    print("\n" + "=" * 50)
-    print("📋 Test Summary")
-    print("=" * 50)
-    print(f"TabContextManager: {'✅ PASSED' if tab_test_passed else '❌ FAILED'}")
-    print(f"ContextManager: {'✅ PASSED' if context_test_passed else '❌ FAILED'}")
-    print(f"Protocol compliance: {'✅ PASSED' if (tab_protocol_ok and context_protocol_ok) else '❌ FAILED'}")
-    
-    if all_passed:
-        print("\n🎉 All tests passed!")
-        print("\n💡 The async context manager error is fixed:")
-        print("   ✅ No more 'async_generator' object errors")
-        print("   ✅ Both context managers work with 'async with'")
-        print("   ✅ Proper __aenter__ and __aexit__ methods implemented")
-        print("   ✅ Exception handling works correctly")
-        return 0
-    else:
-        print("\n❌ Some tests failed!")
-        return 1
+@pytest.fixture(scope="module")
+def service():
+    """Mock service shared by the tests in this module."""
+    return MockService()
+
+
+async def test_context_managers(service):
+    """Test both context managers.
+
+    This only exercises the generator-based managers defined in this module against
+    MockService; the service's own ContextManager is covered by
+    test_screenshot_service_unit.py.
+    """
+    async with tab_context(service, 1280, 720) as (page, browser_index, tab_info):
+        assert (page, browser_index, tab_info) == ("mock_page", 1, "mock_tab_info")
+
+    async with browser_context(service, 1280, 720) as (context, browser_index, page):
+        assert (context, browser_index) == ("mock_context", 1)
+        assert not page.is_closed()
+    assert page.is_closed()
+
+    # asynccontextmanager provides __aenter__ and __aexit__
+    assert isinstance(tab_context(service, 1280, 720), AbstractAsyncContextManager)
+    assert isinstance(browser_context(service, 1280, 720), AbstractAsyncContextManager)
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(test_context_managers())
-    exit(exit_code)
+    asyncio.run(test_context_managers(MockService()))
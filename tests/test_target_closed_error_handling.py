@@ -5,6 +5,8 @@ Test for TargetClosedError handling in the retry service.
 This module tests that TargetClosedError is properly handled as a retryable error.
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import MagicMock
 
@@ -22,36 +24,54 @@ except ImportError:
     PLAYWRIGHT_AVAILABLE = False
 
 
+def _make_retry_manager():
+    """Build the retry manager under test, with a compressed backoff schedule."""
+    retry_config = RetryConfig(
+        max_retries=3,
+        base_delay=0.001,
+        max_delay=0.01,
+        jitter=0.0
+    )
+    return RetryManager(retry_config=retry_config, name="test_retry_manager")
+
+
+def _mock_timeout_error():
+    """Build an error whose class is named TimeoutError without being the builtin."""
+    class MockTimeoutError(Exception):
+        pass
+    MockTimeoutError.__name__ = "TimeoutError"
+    return MockTimeoutError("Connection timeout")
+
+
+@pytest.fixture(scope="class")
+def retry_manager():
+    """Retry manager shared by the tests that only classify errors."""
+    return _make_retry_manager()
+
+
+@pytest.fixture
+def fresh_retry_manager():
+    """Retry manager for a single test, for tests that record retry stats."""
+    return _make_retry_manager()
+
+
 class TestTargetClosedErrorHandling:
     """Test TargetClosedError handling in retry logic."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.retry_config = RetryConfig(
-            max_retries=3,
-            base_delay=0.1,
-            max_delay=1.0,
-            jitter=0.1
-        )
-        self.retry_manager = RetryManager(
-            retry_config=self.retry_config,
-            name="test_retry_manager"
-        )
-
-    def test_target_closed_error_should_retry(self):
+    def test_target_closed_error_should_retry(self, retry_manager):
         """Test that TargetClosedError is marked as retryable."""
         # Create a TargetClosedError
         error = TargetClosedError("Target closed")
         
         # Test that it should be retried
-        should_retry = self.retry_manager._should_retry_error(error, retry_count=0)
+        should_retry = retry_manager._should_retry_error(error, retry_count=0)
         assert should_retry, "TargetClosedError should be retryable"
         
         # Test that it should be retried even on subsequent attempts
-        should_retry = self.retry_manager._should_retry_error(error, retry_count=1)
+        should_retry = retry_manager._should_retry_error(error, retry_count=1)
         assert should_retry, "TargetClosedError should be retryable on retry attempts"
 
-    def test_target_closed_error_by_name(self):
+    def test_target_closed_error_by_name(self, retry_manager):
         """Test that errors with 'TargetClosedError' name are retryable."""
         # Create a custom error class with TargetClosedError name
         class MockTargetClosedError(Exception):
@@ -61,16 +81,16 @@ class TestTargetClosedErrorHandling:
         error = MockTargetClosedError("Target closed")
 
         # Test that it should be retried
-        should_retry = self.retry_manager._should_retry_error(error, retry_count=0)
+        should_retry = retry_manager._should_retry_error(error, retry_count=0)
         assert should_retry, "Error with TargetClosedError name should be retryable"
 
-    def test_target_closed_error_by_message_pattern(self):
+    def test_target_closed_error_by_message_pattern(self, retry_manager):
         """Test that errors with 'target closed' message are retryable."""
         # Create an error with target closed message
         error = Exception("The target closed unexpectedly")
         
         # Test that it should be retried
-        should_retry = self.retry_manager._should_retry_error(error, retry_count=0)
+        should_retry = retry_manager._should_retry_error(error, retry_count=0)
         assert should_retry, "Error with 'target closed' message should be retryable"
 
     def test_target_closed_error_classification(self):
@@ -91,8 +111,7 @@ class TestTargetClosedErrorHandling:
         error_class = classify_exception(error)
         assert error_class == BrowserError, "Error with 'target closed' message should be classified as BrowserError"
 
-    @pytest.mark.asyncio
-    async def test_target_closed_error_retry_execution(self):
+    async def test_target_closed_error_retry_execution(self, fresh_retry_manager):
         """Test that TargetClosedError triggers retry in execution."""
         call_count = 0
         
@@ -103,44 +122,32 @@ class TestTargetClosedErrorHandling:
                 raise TargetClosedError("Target closed")
             return "success"
         
-        # Execute with retry
-        result = await self.retry_manager.execute(
-            failing_operation,
-            operation_name="test_target_closed_retry"
-        )
+        # Execute with retry, failing fast if the backoff stops being compressed
+        async with asyncio.timeout(5):
+            result = await fresh_retry_manager.execute(
+                failing_operation,
+                operation_name="test_target_closed_retry"
+            )
         
         # Verify it succeeded after retries
         assert result == "success"
         assert call_count == 3, "Should have retried 2 times before succeeding"
         
         # Check retry stats
-        stats = self.retry_manager.get_stats()
+        stats = fresh_retry_manager.get_stats()
         assert stats["retries"] == 2, "Should have recorded 2 retries"
         assert stats["successes"] == 1, "Should have recorded 1 success"
 
-    def test_other_errors_still_work(self):
+    @pytest.mark.parametrize("exc_factory, retry_count, expected", [
+        pytest.param(lambda: ValueError("Invalid value"), 0, False, id="permanent"),
+        pytest.param(_mock_timeout_error, 0, True, id="transient"),
+        pytest.param(lambda: Exception("Unknown error"), 0, True, id="unknown-first-attempt"),
+        pytest.param(lambda: Exception("Unknown error"), 3, False, id="unknown-after-limit"),
+    ])
+    def test_other_errors_still_work(self, retry_manager, exc_factory, retry_count, expected):
         """Test that other error types are still handled correctly."""
-        # Test permanent error (should not retry)
-        permanent_error = ValueError("Invalid value")
-        should_retry = self.retry_manager._should_retry_error(permanent_error, retry_count=0)
-        assert not should_retry, "ValueError should not be retryable"
-
-        # Test transient error (should retry)
-        class MockTimeoutError(Exception):
-            pass
-        MockTimeoutError.__name__ = "TimeoutError"
-
-        transient_error = MockTimeoutError("Connection timeout")
-        should_retry = self.retry_manager._should_retry_error(transient_error, retry_count=0)
-        assert should_retry, "TimeoutError should be retryable"
-
-        # Test unknown error (should retry with limit)
-        unknown_error = Exception("Unknown error")
-        should_retry = self.retry_manager._should_retry_error(unknown_error, retry_count=0)
-        assert should_retry, "Unknown error should be retryable initially"
-
-        should_retry = self.retry_manager._should_retry_error(unknown_error, retry_count=3)
-        assert not should_retry, "Unknown error should not be retryable after 3 attempts"
+        should_retry = retry_manager._should_retry_error(exc_factory(), retry_count=retry_count)
+        assert should_retry is expected
 
 
 if __name__ == "__main__":
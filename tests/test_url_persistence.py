@@ -10,26 +10,97 @@ This test specifically targets scenarios that might cause URLs to become null:
 """
 
 import asyncio
-import json
+import os
+import sys
 import time
+from datetime import datetime
+from hashlib import blake2b
 from typing import Dict, Any
 import httpx
-from datetime import datetime
+import pytest
+
+# Add the project root to the Python path so the script also runs directly
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.utils.speedups import JSON_INDENT, json_dumps, json_loads, new_event_loop
+
+JSON_HEADERS = {"Content-Type": "application/json"}
 
 BASE_URL = "http://localhost:8000"
 TEST_URL = "https://example.com"
+CONCURRENT_JOBS = 5
+
+# Both tests drive real batch jobs that capture live sites, and the persistence monitor runs for 10 minutes
+pytestmark = [pytest.mark.slow, pytest.mark.network]
+
+def _make_client() -> httpx.AsyncClient:
+    """Create the pooled client used when this module is run against a live server.
+
+    Keeps one connection per concurrent job alive so submissions do not
+    queue behind each other or reconnect between polls. Under pytest the
+    tests take the shared async_client fixture from conftest.py instead.
+    """
+    limits = httpx.Limits(max_keepalive_connections=CONCURRENT_JOBS, max_connections=CONCURRENT_JOBS * 2)
+    return httpx.AsyncClient(timeout=60.0, limits=limits)
+
+
+def _save_results(path: str, results: Dict[str, Any]) -> None:
+    """Write test results to a JSON file, indented only when VERBOSE is set."""
+    with open(path, "wb") as f:
+        f.write(json_dumps(results, indent=JSON_INDENT))
+
+
+async def _poll_until_complete(client, url, start=0.2, factor=1.5, cap=5.0):
+    """Poll a batch results URL until the job completes, backing off while it is still running.
 
-async def test_url_persistence():
-    """Test URL persistence over an extended period with detailed monitoring."""
+    Args:
+        client: httpx.AsyncClient to poll with
+        url: Results URL, which answers 202 while the job is processing
+        start: First delay between polls, in seconds
+        factor: Multiplier applied to the delay after each 202
+        cap: Longest delay between polls, in seconds
+
+    Returns:
+        Parsed JSON of the first 200 response
+
+    Raises:
+        httpx.HTTPStatusError: If the results URL answers with an error status
+    """
+    delay = start
+    while True:
+        response = await client.get(url)
+        if response.status_code == 200:
+            return json_loads(response.content)
+        if response.status_code != 202:
+            response.raise_for_status()
+        print(f"⏳ Still processing, checking again in {delay:.1f}s...")
+        await asyncio.sleep(delay)
+        delay = min(delay * factor, cap)
+
+
+async def _wait_for_completion(client, job_id):
+    """Wait for a batch job to finish and return its results.
+
+    Args:
+        client: httpx.AsyncClient to poll with
+        job_id: ID of the submitted batch job
+
+    Returns:
+        Parsed JSON of the job results
+    """
+    return await _poll_until_complete(client, f"{BASE_URL}/batch/screenshots/{job_id}/results")
+
+
+async def test_url_persistence(async_client, n_jobs: int = CONCURRENT_JOBS):
+    """Test URL persistence of several jobs monitored side by side over an extended period."""
     print("🧪 Testing Batch Screenshot URL Persistence")
     print("="*60)
     
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        # Submit batch job
-        payload = {
+    def make_payload(index):
+        return {
             "items": [
                 {
-                    "id": "persistence-test-1",
+                    "id": f"persistence-test-{index + 1}",
                     "url": TEST_URL,
                     "width": 1280,
                     "height": 720,
@@ -42,72 +113,77 @@ async def test_url_persistence():
                 "cache": True
             }
         }
-        
-        print("📤 Submitting batch job...")
-        response = await client.post(f"{BASE_URL}/batch/screenshots", json=payload)
+    
+    # Submit batch jobs
+    print(f"📤 Submitting {n_jobs} batch jobs...")
+    responses = await asyncio.gather(*(
+        async_client.post(f"{BASE_URL}/batch/screenshots", content=json_dumps(make_payload(index)), headers=JSON_HEADERS)
+        for index in range(n_jobs)
+    ))
+    job_ids = []
+    for response in responses:
         response.raise_for_status()
-        job_data = response.json()
-        job_id = job_data["job_id"]
-        print(f"✓ Job submitted: {job_id}")
-        
-        # Wait for completion
-        print("⏳ Waiting for job completion...")
-        while True:
-            try:
-                response = await client.get(f"{BASE_URL}/batch/screenshots/{job_id}/results")
-                if response.status_code == 200:
-                    results = response.json()
-                    print(f"✓ Job completed with status: {results['status']}")
-                    break
-                elif response.status_code == 202:
-                    print("⏳ Still processing...")
-                    await asyncio.sleep(2)
-                else:
-                    response.raise_for_status()
-            except Exception as e:
-                print(f"❌ Error checking job status: {e}")
-                await asyncio.sleep(2)
-        
-        # Initial URL check
+        job_ids.append(json_loads(response.content)["job_id"])
+        print(f"✓ Job submitted: {job_ids[-1]}")
+    
+    # Wait for completion
+    print("⏳ Waiting for job completion...")
+    completed = await asyncio.gather(*(_wait_for_completion(async_client, job_id) for job_id in job_ids))
+    
+    # Initial URL check
+    initial_urls = {}
+    for job_id, results in zip(job_ids, completed):
+        print(f"✓ Job {job_id} completed with status: {results['status']}")
         initial_url = results["results"][0].get("url")
         print(f"✓ Initial URL: {initial_url[:100] if initial_url else 'NULL'}...")
         
         if not initial_url:
-            print("❌ CRITICAL: URL is already null after job completion!")
+            print(f"❌ CRITICAL: URL of job {job_id} is already null after job completion!")
             return
-        
-        # Extended monitoring
-        print(f"\n🔍 Starting extended monitoring for 10 minutes...")
-        print("Checking every 30 seconds for URL persistence...")
-        
-        start_time = time.time()
+        initial_urls[job_id] = initial_url
+    
+    # Extended monitoring
+    print(f"\n🔍 Starting extended monitoring of {n_jobs} jobs for 10 minutes...")
+    print("Checking every 30 seconds for URL persistence...")
+    
+    start_time = time.monotonic()
+    deadline = start_time + 600  # 10 minutes
+    detections = asyncio.Queue()
+    
+    async def monitor(job_id, initial_url):
+        """Check one job every 30 seconds until the window closes, returning the check count."""
         check_count = 0
-        null_detections = []
-        
-        # Monitor for 10 minutes
-        while time.time() - start_time < 600:  # 10 minutes
+        # Digest and decoded JSON of the last body, so unchanged results are not parsed again
+        last_hash = last_parsed = None
+        # Read the clock once per check and reuse it for the deadline and the elapsed time
+        while (now := time.monotonic()) < deadline:
             check_count += 1
-            elapsed = int(time.time() - start_time)
+            elapsed = int(now - start_time)
             
             try:
-                response = await client.get(f"{BASE_URL}/batch/screenshots/{job_id}/results")
+                response = await async_client.get(f"{BASE_URL}/batch/screenshots/{job_id}/results")
                 response.raise_for_status()
-                current_results = response.json()
+                digest = blake2b(response.content, digest_size=8).digest()
+                if digest != last_hash:
+                    last_hash, last_parsed = digest, json_loads(response.content)
                 
-                current_url = current_results["results"][0].get("url")
+                items = last_parsed["results"]
+                first = items[0] if items else {}
+                current_url = first.get("url")
                 
                 if current_url is None:
-                    null_detections.append({
+                    detections.put_nowait({
+                        "job_id": job_id,
                         "check_number": check_count,
                         "elapsed_seconds": elapsed,
                         "timestamp": datetime.now().isoformat(),
-                        "full_item": current_results["results"][0]
+                        "full_item": first
                     })
-                    print(f"❌ Check {check_count} ({elapsed}s): URL is NULL!")
+                    print(f"❌ Job {job_id} check {check_count} ({elapsed}s): URL is NULL!")
                 else:
                     url_changed = current_url != initial_url
                     change_indicator = " (CHANGED)" if url_changed else ""
-                    print(f"✓ Check {check_count} ({elapsed}s): URL present{change_indicator}")
+                    print(f"✓ Job {job_id} check {check_count} ({elapsed}s): URL present{change_indicator}")
                     
                     if url_changed:
                         print(f"  Old: {initial_url[:50]}...")
@@ -116,148 +192,157 @@ async def test_url_persistence():
                 await asyncio.sleep(30)  # Check every 30 seconds
                 
             except Exception as e:
-                print(f"❌ Check {check_count} failed: {e}")
+                print(f"❌ Job {job_id} check {check_count} failed: {e}")
                 await asyncio.sleep(30)
-        
-        # Final analysis
-        print(f"\n📊 FINAL ANALYSIS")
-        print("="*60)
-        print(f"Total monitoring time: 10 minutes")
-        print(f"Total checks performed: {check_count}")
-        print(f"NULL URL detections: {len(null_detections)}")
-        
-        if null_detections:
-            print("❌ BUG CONFIRMED: URL became null during monitoring!")
-            print("\nNull detection details:")
-            for detection in null_detections:
-                print(f"  - Check {detection['check_number']} at {detection['elapsed_seconds']}s")
-        else:
-            print("✅ No bug detected: URL remained persistent throughout monitoring")
-        
-        # Save results
-        test_results = {
-            "job_id": job_id,
-            "initial_url": initial_url,
-            "monitoring_duration_seconds": 600,
-            "total_checks": check_count,
-            "null_detections": null_detections,
-            "test_timestamp": datetime.now().isoformat()
-        }
-        
-        with open("url_persistence_test_results.json", "w") as f:
-            json.dump(test_results, f, indent=2)
-        
-        print(f"\n💾 Results saved to: url_persistence_test_results.json")
+        return check_count
+    
+    check_counts = await asyncio.gather(*(monitor(job_id, url) for job_id, url in initial_urls.items()))
+    null_detections = []
+    while not detections.empty():
+        null_detections.append(detections.get_nowait())
+    
+    # Final analysis
+    print(f"\n📊 FINAL ANALYSIS")
+    print("="*60)
+    print(f"Total monitoring time: 10 minutes")
+    print(f"Jobs monitored: {len(initial_urls)}")
+    print(f"Total checks performed: {sum(check_counts)}")
+    print(f"NULL URL detections: {len(null_detections)}")
+    
+    if null_detections:
+        print("❌ BUG CONFIRMED: URL became null during monitoring!")
+        print("\nNull detection details:")
+        for detection in null_detections:
+            print(f"  - Job {detection['job_id']} check {detection['check_number']} at {detection['elapsed_seconds']}s")
+    else:
+        print("✅ No bug detected: URL remained persistent throughout monitoring")
+    
+    # Save results
+    test_results = {
+        "job_ids": job_ids,
+        "initial_urls": initial_urls,
+        "monitoring_duration_seconds": 600,
+        "total_checks": sum(check_counts),
+        "null_detections": null_detections,
+        "test_timestamp": datetime.now().isoformat()
+    }
+    
+    # Encode and write off the event loop, which may still be running the load test
+    await asyncio.to_thread(_save_results, "url_persistence_test_results.json", test_results)
+    
+    print(f"\n💾 Results saved to: url_persistence_test_results.json")
 
-async def test_concurrent_load():
+async def test_concurrent_load(async_client):
     """Test URL persistence under concurrent load."""
     print("\n" + "="*60)
     print("🧪 Testing URL Persistence Under Concurrent Load")
     print("="*60)
     
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        # Submit multiple jobs concurrently
-        job_ids = []
-        tasks = []
-        
-        for i in range(5):
-            payload = {
-                "items": [
-                    {
-                        "id": f"load-test-{i}",
-                        "url": f"https://httpbin.org/delay/{i % 3}",  # Variable delay
-                        "width": 1280,
-                        "height": 720,
-                        "format": "png"
-                    }
-                ],
-                "config": {
-                    "parallel": 1,
-                    "timeout": 30,
-                    "cache": False  # Disable cache to force processing
+    # Submit multiple jobs concurrently
+    job_ids = []
+    tasks = []
+    
+    for i in range(CONCURRENT_JOBS):
+        payload = {
+            "items": [
+                {
+                    "id": f"load-test-{i}",
+                    "url": f"https://httpbin.org/delay/{i % 3}",  # Variable delay
+                    "width": 1280,
+                    "height": 720,
+                    "format": "png"
                 }
+            ],
+            "config": {
+                "parallel": 1,
+                "timeout": 30,
+                "cache": False  # Disable cache to force processing
             }
-            
-            task = client.post(f"{BASE_URL}/batch/screenshots", json=payload)
-            tasks.append(task)
-        
-        print("📤 Submitting 5 concurrent batch jobs...")
-        responses = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for i, response in enumerate(responses):
-            if isinstance(response, Exception):
-                print(f"❌ Job {i} failed: {response}")
-            else:
-                try:
-                    response.raise_for_status()
-                    job_data = response.json()
-                    job_ids.append(job_data["job_id"])
-                    print(f"✓ Job {i} submitted: {job_data['job_id']}")
-                except Exception as e:
-                    print(f"❌ Job {i} error: {e}")
-        
-        if not job_ids:
-            print("❌ No jobs submitted successfully")
-            return
-        
-        # Wait for all jobs to complete
-        print(f"\n⏳ Waiting for {len(job_ids)} jobs to complete...")
-        completed_jobs = []
+        }
         
-        for job_id in job_ids:
-            while True:
-                try:
-                    response = await client.get(f"{BASE_URL}/batch/screenshots/{job_id}/results")
-                    if response.status_code == 200:
-                        results = response.json()
-                        completed_jobs.append((job_id, results))
-                        print(f"✓ Job {job_id} completed")
-                        break
-                    elif response.status_code == 202:
-                        await asyncio.sleep(1)
-                    else:
-                        response.raise_for_status()
-                except Exception as e:
-                    print(f"❌ Error with job {job_id}: {e}")
-                    break
+        task = async_client.post(f"{BASE_URL}/batch/screenshots", content=json_dumps(payload), headers=JSON_HEADERS)
+        tasks.append(task)
+    
+    print(f"📤 Submitting {CONCURRENT_JOBS} concurrent batch jobs...")
+    responses = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    for i, response in enumerate(responses):
+        if isinstance(response, Exception):
+            print(f"❌ Job {i} failed: {response}")
+        else:
+            try:
+                response.raise_for_status()
+                job_data = json_loads(response.content)
+                job_ids.append(job_data["job_id"])
+                print(f"✓ Job {i} submitted: {job_data['job_id']}")
+            except Exception as e:
+                print(f"❌ Job {i} error: {e}")
+    
+    if not job_ids:
+        print("❌ No jobs submitted successfully")
+        return
+    
+    # Wait for all jobs to complete
+    print(f"\n⏳ Waiting for {len(job_ids)} jobs to complete...")
+    
+    async def wait_for_job(job_id):
+        try:
+            results = await _wait_for_completion(async_client, job_id)
+        except Exception as e:
+            print(f"❌ Error with job {job_id}: {e}")
+            return None
+        print(f"✓ Job {job_id} completed")
+        return job_id, results
+    
+    async def recheck(job_id, initial_results):
+        initial_url = initial_results["results"][0].get("url")
+        print(f"Job {job_id}: Initial URL {'present' if initial_url else 'NULL'}")
         
-        # Monitor all completed jobs for URL persistence
-        print(f"\n🔍 Monitoring {len(completed_jobs)} jobs for URL persistence...")
+        # Check again after a delay
+        await asyncio.sleep(10)
         
-        for job_id, initial_results in completed_jobs:
-            initial_url = initial_results["results"][0].get("url")
-            print(f"Job {job_id}: Initial URL {'present' if initial_url else 'NULL'}")
-            
-            # Check again after a delay
-            await asyncio.sleep(10)
+        try:
+            response = await async_client.get(f"{BASE_URL}/batch/screenshots/{job_id}/results")
+            response.raise_for_status()
+            current_results = json_loads(response.content)
+            items = current_results["results"]
+            first = items[0] if items else {}
+            current_url = first.get("url")
             
-            try:
-                response = await client.get(f"{BASE_URL}/batch/screenshots/{job_id}/results")
-                response.raise_for_status()
-                current_results = response.json()
-                current_url = current_results["results"][0].get("url")
+            if initial_url and not current_url:
+                print(f"❌ Job {job_id}: URL became NULL!")
+            elif not initial_url and current_url:
+                print(f"✓ Job {job_id}: URL appeared!")
+            elif initial_url != current_url:
+                print(f"⚠️  Job {job_id}: URL changed!")
+            else:
+                print(f"✓ Job {job_id}: URL persistent")
                 
-                if initial_url and not current_url:
-                    print(f"❌ Job {job_id}: URL became NULL!")
-                elif not initial_url and current_url:
-                    print(f"✓ Job {job_id}: URL appeared!")
-                elif initial_url != current_url:
-                    print(f"⚠️  Job {job_id}: URL changed!")
-                else:
-                    print(f"✓ Job {job_id}: URL persistent")
-                    
-            except Exception as e:
-                print(f"❌ Error checking job {job_id}: {e}")
+        except Exception as e:
+            print(f"❌ Error checking job {job_id}: {e}")
+    
+    # Handle jobs in completion order, so each one's persistence check starts as soon as it finishes
+    completed_jobs = []
+    async with asyncio.TaskGroup() as tg:
+        for completion in asyncio.as_completed([wait_for_job(job_id) for job_id in job_ids]):
+            job = await completion
+            if job is not None:
+                completed_jobs.append(job)
+                tg.create_task(recheck(*job))
+    
+    print(f"\n🔍 Checked {len(completed_jobs)} completed jobs for URL persistence")
 
 async def main():
     """Run all URL persistence tests."""
     try:
-        await test_url_persistence()
-        await test_concurrent_load()
+        async with _make_client() as client, asyncio.TaskGroup() as tg:
+            # The monitor mostly sleeps between checks, so the load test runs alongside it
+            tg.create_task(test_url_persistence(client))
+            tg.create_task(test_concurrent_load(client))
     except Exception as e:
         print(f"❌ Test suite failed: {e}")
         import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(), loop_factory=new_event_loop)
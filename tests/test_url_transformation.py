@@ -6,13 +6,51 @@ Tests the URL transformation feature for viding.co and viding.org domains
 
 import pytest
 import asyncio
-import aiohttp
-import json
-from typing import Dict, Any
+import httpx
+import os
+import sys
+from typing import Dict, Any, Optional, Tuple
+
+# Add the project root to the Python path so the script also runs directly
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.utils.speedups import json_dumps, json_loads, new_event_loop
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Single screenshot requests in flight at once
+MAX_CONCURRENT_REQUESTS = 4
+
+# URLs to capture, each with the target the transformer should rewrite it to
+TEST_CASES: Tuple[Tuple[str, str], ...] = (
+    ("https://viding.co", "http://viding-co_website-revamp"),
+    ("https://www.viding.co", "http://viding-co_website-revamp"),
+    ("https://viding.co/about", "http://viding-co_website-revamp/about"),
+    ("https://viding.org", "http://viding-org_website-revamp"),
+    ("https://www.viding.org", "http://viding-org_website-revamp"),
+    ("https://viding.org/contact", "http://viding-org_website-revamp/contact"),
+    ("https://example.com", "No transformation (should remain as-is)"),
+    ("https://google.com", "No transformation (should remain as-is)"),
+)
+
 
 class URLTransformationTester:
-    def __init__(self, base_url: str = "http://localhost:8000"):
+    def __init__(self, base_url: str = "http://localhost:8000", client: Optional[httpx.AsyncClient] = None):
         self.base_url = base_url
+        # A client passed in is shared with the caller and left open on exit
+        self.client = client
+        self._owns_client = client is None
+    
+    async def __aenter__(self):
+        if self._owns_client:
+            # One keep-alive pool for every request instead of a client per call
+            limits = httpx.Limits(max_connections=100, keepalive_expiry=60)
+            self.client = httpx.AsyncClient(limits=limits)
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._owns_client and self.client:
+            await self.client.aclose()
     
     async def test_single_screenshot_transformation(self, url: str, expected_transformation: str = None) -> Dict[str, Any]:
         """Test URL transformation for single screenshot endpoint."""
@@ -23,36 +61,36 @@ class URLTransformationTester:
             "format": "png"
         }
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(
-                    f"{self.base_url}/screenshot",
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=60)
-                ) as response:
-                    result = {
-                        "original_url": url,
-                        "expected_transformation": expected_transformation,
-                        "status_code": response.status,
-                        "success": response.status == 200
-                    }
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        result["response"] = data
-                    else:
-                        result["error"] = await response.text()
-                    
-                    return result
-            except Exception as e:
-                return {
-                    "original_url": url,
-                    "expected_transformation": expected_transformation,
-                    "status_code": 0,
-                    "success": False,
-                    "error": str(e)
-                }
-    
+        try:
+            response = await self.client.post(
+                f"{self.base_url}/screenshot",
+                content=json_dumps(payload),
+                headers=JSON_HEADERS,
+                timeout=60.0
+            )
+            result = {
+                "original_url": url,
+                "expected_transformation": expected_transformation,
+                "status_code": response.status_code,
+                "success": response.status_code == 200
+            }
+            
+            if response.status_code == 200:
+                data = json_loads(response.content)
+                result["response"] = data
+            else:
+                result["error"] = response.text
+            
+            return result
+        except Exception as e:
+            return {
+                "original_url": url,
+                "expected_transformation": expected_transformation,
+                "status_code": 0,
+                "success": False,
+                "error": str(e)
+            }
+
     async def test_batch_screenshot_transformation(self, urls: list) -> Dict[str, Any]:
         """Test URL transformation for batch screenshot endpoint."""
         items = []
@@ -75,58 +113,59 @@ class URLTransformationTester:
             }
         }
         
-        async with aiohttp.ClientSession() as session:
+        try:
+            # Submit batch job
+            response = await self.client.post(
+                f"{self.base_url}/batch/screenshots",
+                content=json_dumps(payload),
+                headers=JSON_HEADERS,
+                timeout=10.0
+            )
+            if response.status_code != 202:
+                return {
+                    "success": False,
+                    "error": f"Failed to submit batch: {response.status_code}",
+                    "response": response.text
+                }
+            
+            batch_data = json_loads(response.content)
+            job_id = batch_data["job_id"]
+            
+            # Poll for completion
+            max_wait = 300  # 5 minutes
             try:
-                # Submit batch job
-                async with session.post(
-                    f"{self.base_url}/batch/screenshots",
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status != 202:
-                        return {
-                            "success": False,
-                            "error": f"Failed to submit batch: {response.status}",
-                            "response": await response.text()
-                        }
-                    
-                    batch_data = await response.json()
-                    job_id = batch_data["job_id"]
-                
-                # Poll for completion
-                max_wait = 300  # 5 minutes
-                poll_start = asyncio.get_event_loop().time()
-                
-                while asyncio.get_event_loop().time() - poll_start < max_wait:
-                    async with session.get(f"{self.base_url}/batch/screenshots/{job_id}") as response:
-                        if response.status == 200:
-                            status_data = await response.json()
+                # One deadline for the whole poll instead of reading the clock every iteration
+                async with asyncio.timeout(max_wait):
+                    while True:
+                        response = await self.client.get(f"{self.base_url}/batch/screenshots/{job_id}")
+                        if response.status_code == 200:
+                            status_data = json_loads(response.content)
                             if status_data["status"] in ["completed", "failed"]:
                                 # Get results
-                                async with session.get(f"{self.base_url}/batch/screenshots/{job_id}/results") as results_response:
-                                    if results_response.status == 200:
-                                        results_data = await results_response.json()
-                                        return {
-                                            "success": True,
-                                            "job_id": job_id,
-                                            "status": status_data["status"],
-                                            "results": results_data
-                                        }
-                    
-                    await asyncio.sleep(2)
-                
+                                results_response = await self.client.get(f"{self.base_url}/batch/screenshots/{job_id}/results")
+                                if results_response.status_code == 200:
+                                    results_data = json_loads(results_response.content)
+                                    return {
+                                        "success": True,
+                                        "job_id": job_id,
+                                        "status": status_data["status"],
+                                        "results": results_data
+                                    }
+                        
+                        await asyncio.sleep(2)
+            except TimeoutError:
                 return {
                     "success": False,
                     "error": "Batch processing timeout",
                     "job_id": job_id
                 }
-                
-            except Exception as e:
-                return {
-                    "success": False,
-                    "error": str(e)
-                }
-    
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
     def print_test_results(self, results: list):
         """Print formatted test results."""
         print("=" * 80)
@@ -148,66 +187,32 @@ class URLTransformationTester:
         print(f"\n📊 Summary: {success_count}/{len(results)} tests passed")
         print("=" * 80)
 
-async def main():
-    tester = URLTransformationTester()
-    
-    # Test cases for URL transformation
-    test_cases = [
-        {
-            "url": "https://viding.co",
-            "expected": "http://viding-co_website-revamp"
-        },
-        {
-            "url": "https://www.viding.co",
-            "expected": "http://viding-co_website-revamp"
-        },
-        {
-            "url": "https://viding.co/about",
-            "expected": "http://viding-co_website-revamp/about"
-        },
-        {
-            "url": "https://viding.org",
-            "expected": "http://viding-org_website-revamp"
-        },
-        {
-            "url": "https://www.viding.org",
-            "expected": "http://viding-org_website-revamp"
-        },
-        {
-            "url": "https://viding.org/contact",
-            "expected": "http://viding-org_website-revamp/contact"
-        },
-        {
-            "url": "https://example.com",
-            "expected": "No transformation (should remain as-is)"
-        },
-        {
-            "url": "https://google.com",
-            "expected": "No transformation (should remain as-is)"
-        }
-    ]
-    
+async def main(base_url: str = "http://localhost:8000"):
+    """Run the transformation checks over one shared HTTP client."""
+    async with URLTransformationTester(base_url) as tester:
+        await run_tests(tester)
+
+async def run_tests(tester: URLTransformationTester):
     print("🚀 Starting URL Transformation Tests...")
     print(f"Testing against: {tester.base_url}")
     
     # Test single screenshot endpoint
     print("\n📸 Testing Single Screenshot Endpoint...")
-    single_results = []
+    # The semaphore bounds load on the server, so no pause between requests is needed
+    sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
     
-    for test_case in test_cases:
-        print(f"Testing: {test_case['url']}")
-        result = await tester.test_single_screenshot_transformation(
-            test_case['url'], 
-            test_case['expected']
-        )
-        single_results.append(result)
-        await asyncio.sleep(1)  # Brief pause between requests
+    async def run(url, expected):
+        async with sem:
+            print(f"Testing: {url}")
+            return await tester.test_single_screenshot_transformation(url, expected)
+    
+    single_results = await asyncio.gather(*(run(url, expected) for url, expected in TEST_CASES))
     
     tester.print_test_results(single_results)
     
     # Test batch screenshot endpoint
     print("\n📦 Testing Batch Screenshot Endpoint...")
-    batch_urls = [case['url'] for case in test_cases[:4]]  # Test first 4 URLs
+    batch_urls = [url for url, _ in TEST_CASES[:4]]  # Test first 4 URLs
     batch_result = await tester.test_batch_screenshot_transformation(batch_urls)
     
     if batch_result['success']:
@@ -234,8 +239,5 @@ if __name__ == "__main__":
     
     args = parser.parse_args()
     
-    # Update the tester with the provided URL
-    tester = URLTransformationTester(args.url)
-    
-    # Run the tests
-    asyncio.run(main())
+    # Run the tests against the provided URL
+    asyncio.run(main(args.url), loop_factory=new_event_loop)
@@ -11,132 +11,131 @@ import os
 # Add the app directory to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from app.utils.url_transformer import URLTransformer, transform_url, is_transformable_domain
+from app.utils.url_transformer import URLTransformer, transform_url, is_transformable_domain, url_transformer
+
+
+@pytest.fixture(scope="module")
+def transformer():
+    """Transformer shared by the tests that only read the default rules."""
+    return URLTransformer()
+
+
+@pytest.fixture
+def fresh_transformer():
+    """Transformer for a single test, for tests that add or remove rules."""
+    return URLTransformer()
 
 
 class TestURLTransformer:
     """Test cases for URL transformation functionality."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.transformer = URLTransformer()
-    
-    def test_viding_co_transformation(self):
+    @pytest.mark.parametrize("original, expected", [
+        ("https://viding.co", "http://viding-co_website-revamp"),
+        ("https://www.viding.co", "http://viding-co_website-revamp"),
+        ("http://viding.co", "http://viding-co_website-revamp"),
+        ("https://viding.co/", "http://viding-co_website-revamp/"),
+        ("https://viding.co/about", "http://viding-co_website-revamp/about"),
+        ("https://viding.co/contact?ref=test", "http://viding-co_website-revamp/contact?ref=test"),
+        ("https://viding.co/page#section", "http://viding-co_website-revamp/page#section"),
+    ])
+    def test_viding_co_transformation(self, transformer, original, expected):
         """Test viding.co URL transformation."""
-        test_cases = [
-            ("https://viding.co", "http://viding-co_website-revamp"),
-            ("https://www.viding.co", "http://viding-co_website-revamp"),
-            ("http://viding.co", "http://viding-co_website-revamp"),
-            ("https://viding.co/", "http://viding-co_website-revamp/"),
-            ("https://viding.co/about", "http://viding-co_website-revamp/about"),
-            ("https://viding.co/contact?ref=test", "http://viding-co_website-revamp/contact?ref=test"),
-            ("https://viding.co/page#section", "http://viding-co_website-revamp/page#section"),
-        ]
-        
-        for original, expected in test_cases:
-            result = self.transformer.transform_url(original)
-            assert result == expected, f"Failed for {original}: expected {expected}, got {result}"
+        assert transformer.transform_url(original) == expected
     
-    def test_viding_org_transformation(self):
+    @pytest.mark.parametrize("original, expected", [
+        ("https://viding.org", "http://viding-org_website-revamp"),
+        ("https://www.viding.org", "http://viding-org_website-revamp"),
+        ("http://viding.org", "http://viding-org_website-revamp"),
+        ("https://viding.org/", "http://viding-org_website-revamp/"),
+        ("https://viding.org/services", "http://viding-org_website-revamp/services"),
+        ("https://viding.org/contact?email=test", "http://viding-org_website-revamp/contact?email=test"),
+        ("https://viding.org/page#footer", "http://viding-org_website-revamp/page#footer"),
+    ])
+    def test_viding_org_transformation(self, transformer, original, expected):
         """Test viding.org URL transformation."""
-        test_cases = [
-            ("https://viding.org", "http://viding-org_website-revamp"),
-            ("https://www.viding.org", "http://viding-org_website-revamp"),
-            ("http://viding.org", "http://viding-org_website-revamp"),
-            ("https://viding.org/", "http://viding-org_website-revamp/"),
-            ("https://viding.org/services", "http://viding-org_website-revamp/services"),
-            ("https://viding.org/contact?email=test", "http://viding-org_website-revamp/contact?email=test"),
-            ("https://viding.org/page#footer", "http://viding-org_website-revamp/page#footer"),
-        ]
-        
-        for original, expected in test_cases:
-            result = self.transformer.transform_url(original)
-            assert result == expected, f"Failed for {original}: expected {expected}, got {result}"
-    
-    def test_no_transformation_needed(self):
+        assert transformer.transform_url(original) == expected
+    
+    @pytest.mark.parametrize("url", [
+        "https://example.com",
+        "https://google.com",
+        "https://github.com",
+        "https://stackoverflow.com",
+        "https://viding.net",  # Different TLD
+        "https://myviding.co",  # Subdomain
+        "https://viding.co.uk",  # Different TLD
+        "http://localhost:8000",
+        "https://192.168.1.1",
+    ])
+    def test_no_transformation_needed(self, transformer, url):
         """Test URLs that should not be transformed."""
-        test_cases = [
-            "https://example.com",
-            "https://google.com",
-            "https://github.com",
-            "https://stackoverflow.com",
-            "https://viding.net",  # Different TLD
-            "https://myviding.co",  # Subdomain
-            "https://viding.co.uk",  # Different TLD
-            "http://localhost:8000",
-            "https://192.168.1.1",
-        ]
-        
-        for url in test_cases:
-            result = self.transformer.transform_url(url)
-            assert result == url, f"URL {url} should not be transformed, but got {result}"
-    
-    def test_is_transformable_domain(self):
+        assert transformer.transform_url(url) == url
+    
+    @pytest.mark.parametrize("url", [
+        "https://viding.co:8080/path",
+        "https://user@viding.co/path",
+        "https://viding.co.evil.com",
+        "https://www.www.viding.co",
+    ])
+    def test_host_with_port_or_credentials_not_transformed(self, transformer, url):
+        """Test that only a bare transformable host, not a longer authority, is rewritten."""
+        assert transformer.transform_url(url) == url
+        assert not transformer.is_transformable_domain(url)
+    
+    @pytest.mark.parametrize("url, expected", [
+        ("https://viding.co", True),
+        ("https://www.viding.co", True),
+        ("https://viding.org", True),
+        ("https://www.viding.org", True),
+        ("http://viding.co/path", True),
+        ("http://viding.org/path", True),
+        ("https://example.com", False),
+        ("https://google.com", False),
+        ("https://viding.net", False),
+        ("https://myviding.co", False),
+        ("https://viding.co.uk", False),
+    ])
+    def test_is_transformable_domain(self, transformer, url, expected):
         """Test domain transformation detection."""
-        transformable_cases = [
-            "https://viding.co",
-            "https://www.viding.co",
-            "https://viding.org",
-            "https://www.viding.org",
-            "http://viding.co/path",
-            "http://viding.org/path",
-        ]
-        
-        non_transformable_cases = [
-            "https://example.com",
-            "https://google.com",
-            "https://viding.net",
-            "https://myviding.co",
-            "https://viding.co.uk",
-        ]
-        
-        for url in transformable_cases:
-            assert self.transformer.is_transformable_domain(url), f"Should be transformable: {url}"
-        
-        for url in non_transformable_cases:
-            assert not self.transformer.is_transformable_domain(url), f"Should not be transformable: {url}"
-    
-    def test_get_original_domain(self):
+        assert transformer.is_transformable_domain(url) is expected
+    
+    @pytest.mark.parametrize("url, expected_domain", [
+        ("https://viding.co", "viding.co"),
+        ("https://www.viding.co", "www.viding.co"),
+        ("https://example.com/path", "example.com"),
+        ("http://localhost:8000", "localhost:8000"),
+    ])
+    def test_get_original_domain(self, transformer, url, expected_domain):
         """Test domain extraction."""
-        test_cases = [
-            ("https://viding.co", "viding.co"),
-            ("https://www.viding.co", "www.viding.co"),
-            ("https://example.com/path", "example.com"),
-            ("http://localhost:8000", "localhost:8000"),
-        ]
-        
-        for url, expected_domain in test_cases:
-            result = self.transformer.get_original_domain(url)
-            assert result == expected_domain, f"Failed for {url}: expected {expected_domain}, got {result}"
+        assert transformer.get_original_domain(url) == expected_domain
     
-    def test_add_transformation_rule(self):
+    def test_add_transformation_rule(self, fresh_transformer):
         """Test adding custom transformation rules."""
         # Add a new rule
-        self.transformer.add_transformation_rule("test.com", "test-com_revamp", "https")
+        fresh_transformer.add_transformation_rule("test.com", "test-com_revamp", "https")
         
         # Test the new rule
-        result = self.transformer.transform_url("https://test.com/page")
+        result = fresh_transformer.transform_url("https://test.com/page")
         expected = "https://test-com_revamp/page"
         assert result == expected, f"Custom rule failed: expected {expected}, got {result}"
         
         # Test that it's detected as transformable
-        assert self.transformer.is_transformable_domain("https://test.com")
+        assert fresh_transformer.is_transformable_domain("https://test.com")
     
-    def test_remove_transformation_rule(self):
+    def test_remove_transformation_rule(self, fresh_transformer):
         """Test removing transformation rules."""
         # Remove viding.co rule
-        self.transformer.remove_transformation_rule("viding.co")
+        fresh_transformer.remove_transformation_rule("viding.co")
         
         # Test that it's no longer transformed
-        result = self.transformer.transform_url("https://viding.co")
+        result = fresh_transformer.transform_url("https://viding.co")
         assert result == "https://viding.co", "Rule should be removed"
         
         # Test that it's no longer detected as transformable
-        assert not self.transformer.is_transformable_domain("https://viding.co")
+        assert not fresh_transformer.is_transformable_domain("https://viding.co")
     
-    def test_list_transformation_rules(self):
+    def test_list_transformation_rules(self, transformer):
         """Test listing transformation rules."""
-        rules = self.transformer.list_transformation_rules()
+        rules = transformer.list_transformation_rules()
         
         # Should contain the default rules
         assert "viding.co" in rules
@@ -148,20 +147,17 @@ class TestURLTransformer:
         assert rules["viding.org"]["new_domain"] == "viding-org_website-revamp"
         assert rules["viding.org"]["protocol"] == "http"
     
-    def test_malformed_urls(self):
+    @pytest.mark.parametrize("url", [
+        "not-a-url",
+        "ftp://invalid",
+        "",
+        "https://",
+        "://missing-protocol",
+    ])
+    def test_malformed_urls(self, transformer, url):
         """Test handling of malformed URLs."""
-        malformed_urls = [
-            "not-a-url",
-            "ftp://invalid",
-            "",
-            "https://",
-            "://missing-protocol",
-        ]
-        
-        for url in malformed_urls:
-            # Should not crash and should return original URL
-            result = self.transformer.transform_url(url)
-            assert result == url, f"Malformed URL {url} should be returned as-is"
+        # Should not crash and should return original URL
+        assert transformer.transform_url(url) == url
     
     def test_convenience_functions(self):
         """Test the convenience functions."""
@@ -173,6 +169,21 @@ class TestURLTransformer:
         assert is_transformable_domain("https://viding.co")
         assert not is_transformable_domain("https://example.com")
 
+    def test_convenience_functions_see_rule_changes(self):
+        """Test that cached convenience lookups are dropped when the global rules change."""
+        url = "https://cached.example/page"
+        assert transform_url(url) == url
+        
+        url_transformer.add_transformation_rule("cached.example", "cached-example_revamp")
+        try:
+            assert transform_url(url) == "http://cached-example_revamp/page"
+            assert is_transformable_domain(url)
+        finally:
+            url_transformer.remove_transformation_rule("cached.example")
+        
+        assert transform_url(url) == url
+        assert not is_transformable_domain(url)
+
 
 def test_url_transformer_integration():
     """Integration test to ensure the transformer works as expected."""
@@ -188,42 +199,4 @@ def test_url_transformer_integration():
 
 
 if __name__ == "__main__":
-    # Run the tests
-    import unittest
-    
-    # Create a test suite
-    loader = unittest.TestLoader()
-    suite = loader.loadTestsFromTestCase(TestURLTransformer)
-    
-    # Run the tests
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
-    
-    # Run integration test
-    print("\n" + "="*50)
-    print("Running Integration Test...")
-    try:
-        test_url_transformer_integration()
-        print("✅ Integration test passed!")
-    except AssertionError as e:
-        print(f"❌ Integration test failed: {e}")
-    
-    # Print summary
-    print("\n" + "="*50)
-    print("URL Transformer Unit Tests Summary:")
-    print(f"Tests run: {result.testsRun}")
-    print(f"Failures: {len(result.failures)}")
-    print(f"Errors: {len(result.errors)}")
-    
-    if result.failures:
-        print("\nFailures:")
-        for test, traceback in result.failures:
-            print(f"- {test}: {traceback}")
-    
-    if result.errors:
-        print("\nErrors:")
-        for test, traceback in result.errors:
-            print(f"- {test}: {traceback}")
-    
-    success = len(result.failures) == 0 and len(result.errors) == 0
-    print(f"\n{'✅ All tests passed!' if success else '❌ Some tests failed!'}")
+    raise SystemExit(pytest.main([__file__]))
@@ -7,15 +7,16 @@ AsyncClient creation, waiting patterns, and other helper functions.
 """
 
 import asyncio
-import time
-from typing import Callable, Any, Dict, Optional, TypeVar, Awaitable
+from typing import AsyncIterator, Callable, Any, Dict, Optional, Tuple, TypeVar, Awaitable
 
 import httpx
-from fastapi.testclient import TestClient
+from app.core.logging import get_logger
 from app.main import app
 
 T = TypeVar('T')
 
+logger = get_logger("async_test_utils")
+
 
 async def get_async_client() -> httpx.AsyncClient:
     """
@@ -24,6 +25,9 @@ async def get_async_client() -> httpx.AsyncClient:
     This ensures the AsyncClient properly interacts with the FastAPI app
     and avoids event loop issues.
     
+    Tests should normally take the session-scoped async_client fixture from
+    conftest.py; call this only when a test needs a client of its own.
+    
     Returns:
         AsyncClient instance configured for testing
     """
@@ -57,11 +61,13 @@ async def wait_for_condition(
         # Wait for job to complete
         completed = await wait_for_condition(is_job_complete, timeout=60)
     """
-    start_time = time.time()
-    while time.time() - start_time < timeout:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
         if await condition_func():
             return True
-        await asyncio.sleep(interval)
+        # Never sleep past the deadline
+        await asyncio.sleep(min(interval, max(deadline - loop.time(), 0)))
     return False
 
 
@@ -93,38 +99,40 @@ async def wait_for_response_condition(
     Returns:
         Response JSON if condition was met, None if timeout occurred
         
+    Raises:
+        ValueError: If method is not GET, POST, PUT or DELETE
+        
     Example:
-        # Wait for job to reach 'completed' status
+        # Wait for job to reach 'completed' status, polling with the async_client fixture
         response_data = await wait_for_response_condition(
-            client,
+            async_client,
             f"/jobs/{job_id}/status",
             lambda data: data.get("status") in ["completed", "failed"],
             timeout=60
         )
     """
-    start_time = time.time()
-    while time.time() - start_time < timeout:
+    # Resolve the request once; only POST and PUT send a body
+    method = method.upper()
+    if method not in ("GET", "POST", "PUT", "DELETE"):
+        raise ValueError(f"Unsupported HTTP method: {method}")
+    body = json_data if method in ("POST", "PUT") else None
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
         try:
-            if method.upper() == "GET":
-                response = await client.get(url, params=params, headers=headers)
-            elif method.upper() == "POST":
-                response = await client.post(url, params=params, json=json_data, headers=headers)
-            elif method.upper() == "PUT":
-                response = await client.put(url, params=params, json=json_data, headers=headers)
-            elif method.upper() == "DELETE":
-                response = await client.delete(url, params=params, headers=headers)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+            response = await client.request(method, url, params=params, json=body, headers=headers)
                 
             if response.status_code < 400:  # Only check condition for successful responses
                 response_json = response.json()
                 if condition_func(response_json):
                     return response_json
         except Exception as e:
-            # Log exception but continue polling
-            print(f"Error polling {url}: {str(e)}")
+            # Log exception but continue polling; loguru skips formatting below DEBUG
+            logger.debug("Error polling {}: {}", url, e)
             
-        await asyncio.sleep(interval)
+        # Never sleep past the deadline
+        await asyncio.sleep(min(interval, max(deadline - loop.time(), 0)))
     return None
 
 
@@ -132,7 +140,8 @@ async def cleanup_async_resources() -> None:
     """
     Clean up any lingering async resources to prevent event loop issues.
     
-    This should be called at the end of async tests to ensure proper cleanup.
+    Cancels every other task on the running loop, so it runs once at session
+    teardown (see conftest.py) rather than at the end of each test.
     """
     # Get all running tasks in the current event loop
     try:
@@ -178,14 +187,76 @@ async def run_concurrent_requests(
         # Run 10 requests with max 5 concurrent
         results = await run_concurrent_requests(client, make_request, 10, 5)
     """
-    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+    results: list = [None] * count
+    async for i, result in stream_concurrent_requests(client, request_func, count, max_concurrency):
+        results[i] = result
+    return results
+
+
+async def stream_concurrent_requests(
+    client: httpx.AsyncClient,
+    request_func: Callable[[httpx.AsyncClient, int], Awaitable[Any]],
+    count: int,
+    max_concurrency: Optional[int] = None
+) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Run multiple concurrent requests, yielding each result as it completes.
+    
+    Only max_concurrency requests and a small buffer of finished results
+    exist at any time, so memory stays bounded however large count is.
+    Requests still running when the caller stops iterating are cancelled.
+    A request that raises a BaseException other than Exception, such as
+    CancelledError, stops the stream with an error instead of hanging it.
+    
+    Args:
+        client: AsyncClient instance to use for requests
+        request_func: Async function that takes client and request index as arguments
+        count: Number of requests to make
+        max_concurrency: Maximum number of concurrent requests (None for unlimited)
+        
+    Yields:
+        (index, result) pairs in completion order; a failed request yields its exception
+        
+    Example:
+        async for i, result in stream_concurrent_requests(client, make_request, 1000, 20):
+            assert not isinstance(result, Exception), f"Request {i} failed: {result}"
+    """
+    worker_count = min(max_concurrency or count, count)
+    if worker_count <= 0:
+        return
+    
+    indices = iter(range(count))
+    finished: asyncio.Queue = asyncio.Queue(maxsize=worker_count * 2)
     
-    async def wrapped_request(i):
-        if semaphore:
-            async with semaphore:
-                return await request_func(client, i)
-        else:
-            return await request_func(client, i)
+    async def worker():
+        # Workers share one index iterator, so only worker_count requests are ever live
+        for i in indices:
+            try:
+                result = await request_func(client, i)
+            except Exception as e:
+                # Yielded in place, as with gather(return_exceptions=True)
+                result = e
+            await finished.put((i, result))
     
-    tasks = [wrapped_request(i) for i in range(count)]
-    return await asyncio.gather(*tasks, return_exceptions=True)
+    workers = [asyncio.create_task(worker()) for _ in range(worker_count)]
+    running = set(workers)
+    try:
+        for _ in range(count):
+            getter = asyncio.ensure_future(finished.get())
+            try:
+                # Watch the workers too: one killed by a BaseException never puts its result
+                while not getter.done():
+                    done, _ = await asyncio.wait({getter, *running}, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done - {getter}:
+                        running.discard(task)
+                        if task.cancelled():
+                            raise RuntimeError("Request worker was cancelled before finishing")
+                        if task.exception() is not None:
+                            raise task.exception()
+            finally:
+                getter.cancel()
+            yield getter.result()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Deterministic fault injection for retry tests.
+
+Provides a single "fail N times, then succeed" operation to hand to
+RetryManager.execute, with named fault types and optional seeded random
+failures, so tests do not each re-implement their own flaky closure.
+"""
+
+import asyncio
+import random
+from typing import Any, Callable, Dict, Optional, Type, Union
+
+import httpx
+
+from app.core.errors import ValidationError
+
+# Bound at import so tests that patch asyncio.sleep to record backoff delays
+# do not also record the yield below
+_checkpoint = asyncio.sleep
+
+
+def _http_status_error(status_code: int) -> httpx.HTTPStatusError:
+    """Build the error httpx raises for an HTTP error response."""
+    request = httpx.Request("GET", "https://example.com")
+    response = httpx.Response(status_code, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status_code}", request=request, response=response)
+
+
+# Named faults, each mapped to a factory for a fresh exception per raise
+FAULT_TYPES: Dict[str, Callable[[], BaseException]] = {
+    "NetworkTimeout": lambda: TimeoutError("network timeout"),
+    "ConnectionReset": lambda: ConnectionError("connection reset by peer"),
+    "Http5xx": lambda: _http_status_error(503),
+    "Http429": lambda: _http_status_error(429),
+    "InvalidRequest": lambda: ValidationError("invalid-url", field="url"),
+}
+
+Fault = Union[str, Type[BaseException], BaseException]
+
+
+class Flaky:
+    """Async operation that fails its first calls, then returns a fixed result."""
+
+    def __init__(
+        self,
+        fail_first: Optional[int],
+        then: Any = "success",
+        fault: Fault = RuntimeError,
+        failure_rate: float = 0.0,
+        seed: int = 0
+    ):
+        """Initialize the operation.
+
+        Args:
+            fail_first: Number of calls that fail before any succeeds, or None to always fail
+            then: Value returned by successful calls
+            fault: Name from FAULT_TYPES, an exception class, or an exception instance
+            failure_rate: Probability that a call after fail_first still fails
+            seed: Seed for the failure_rate draws, so runs are reproducible
+        """
+        self.fail_first = fail_first
+        self.then = then
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.failures = 0
+        self._make_fault = self._fault_factory(fault)
+        self._random = random.Random(seed)
+
+    @staticmethod
+    def _fault_factory(fault: Fault) -> Callable[[], BaseException]:
+        """Normalize a fault specification into an exception factory."""
+        if isinstance(fault, str):
+            return FAULT_TYPES[fault]
+        if isinstance(fault, BaseException):
+            return lambda: fault
+        return lambda: fault("temporary failure")
+
+    def _should_fail(self) -> bool:
+        """Decide whether the current call fails."""
+        if self.fail_first is None or self.calls <= self.fail_first:
+            return True
+        return self._random.random() < self.failure_rate
+
+    async def __call__(self, *args, **kwargs) -> Any:
+        """Run one attempt, yielding to the event loop like a real I/O call."""
+        self.calls += 1
+        await _checkpoint(0)
+        if self._should_fail():
+            self.failures += 1
+            raise self._make_fault()
+        return self.then
+
+
+def flaky(
+    fail_first: Optional[int],
+    then: Any = "success",
+    fault: Fault = RuntimeError,
+    failure_rate: float = 0.0,
+    seed: int = 0
+) -> Flaky:
+    """
+    Create an operation that fails its first fail_first calls, then returns then.
+
+    Args:
+        fail_first: Number of calls that fail before any succeeds, or None to always fail
+        then: Value returned by successful calls
+        fault: Name from FAULT_TYPES, an exception class, or an exception instance
+        failure_rate: Probability that a call after fail_first still fails
+        seed: Seed for the failure_rate draws, so runs are reproducible
+
+    Returns:
+        Flaky async callable; its calls and failures attributes count attempts
+
+    Example:
+        operation = flaky(fail_first=2, fault="NetworkTimeout")
+        result = await retry_manager.execute(operation)
+        assert operation.calls == 3
+    """
+    return Flaky(fail_first, then=then, fault=fault, failure_rate=failure_rate, seed=seed)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Optional speedups shared by the standalone test scripts.
+
+orjson and uvloop are used when installed; otherwise the stdlib json codec
+and the default asyncio event loop are used instead.
+"""
+
+import json
+import os
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional; fall back to the default asyncio loop
+    uvloop = None
+
+# Pretty-print saved results only when VERBOSE is set; compact output is much cheaper
+JSON_INDENT = 2 if os.environ.get("VERBOSE") else None
+
+# Loop factory for asyncio.run(); None selects the default event loop
+new_event_loop = uvloop.new_event_loop if uvloop is not None else None
+
+if orjson is not None:
+    json_loads = orjson.loads
+
+    def json_dumps(obj: Any, indent: Optional[int] = None) -> bytes:
+        """Encode obj as JSON bytes, indented by two spaces when indent is set."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+else:
+    json_loads = json.loads
+
+    def json_dumps(obj: Any, indent: Optional[int] = None) -> bytes:
+        """Encode obj as JSON bytes, indented when indent is set."""
+        return json.dumps(obj, indent=indent).encode("utf-8")